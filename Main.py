@@ -5,52 +5,291 @@ Converts raster images to vector format using VTracer
 Uses your specified parameter settings
 """
 
+import io
 import os
+import re
 import sys
+import gzip
+import json
+import base64
+import queue
+import math
+import time
+import select
+import shutil
+import signal
+import struct
+import tempfile
+import hashlib
+import fnmatch
+import itertools
 import subprocess
 import argparse
+import threading
+import ctypes
+import ctypes.util
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from pathlib import Path
-import tkinter as tk
-from tkinter import filedialog, messagebox
 
-def check_vtracer_installed():
-    """Check if VTracer is installed and accessible"""
+# Default VTracer settings, matching the CLI and GUI defaults
+VTRACER_DEFAULTS = {
+    'colormode': 'color',
+    'hierarchical': 'stacked',
+    'mode': 'spline',
+    'filter_speckle': 4,
+    'color_precision': 6,
+    'gradient_step': 55,
+    'corner_threshold': 105,
+    'segment_length': 7.5,
+    'splice_threshold': 0,
+}
+
+# Input formats picked up from directories
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif'}
+
+# Environment variable that points at a specific VTracer binary
+VTRACER_ENV = 'VTRACER_PATH'
+
+# GUI log: how often queued lines are flushed, how many per flush, how many are kept
+GUI_DRAIN_MS = 50
+GUI_DRAIN_BATCH = 1000
+GUI_LOG_LINES = 5000
+# GUI progress bar refresh interval (10 frames per second)
+GUI_PROGRESS_MS = 100
+# GUI preview: longest side of the traced preview, and the quiet time before it is redrawn
+PREVIEW_SIZE = 256
+PREVIEW_DEBOUNCE_MS = 300
+
+_resolved_vtracer = None
+
+def _vtracer_candidates(explicit=None):
+    """Yield possible VTracer binaries, most specific first"""
+    if explicit:
+        yield explicit
+        return
+    if os.environ.get(VTRACER_ENV):
+        yield os.environ[VTRACER_ENV]
+        return
+    # Prefer the binary shipped next to this script
+    script_dir = Path(os.path.abspath(os.path.dirname(__file__)))
+    names = ['vtracer.exe', 'vtracer'] if os.name == 'nt' else ['vtracer']
+    for name in names:
+        yield str(script_dir / name)
+    found = shutil.which('vtracer')
+    if found:
+        yield found
+
+def _probe_vtracer(path):
+    """Run the binary once to confirm it works; returns its version or None"""
     try:
-        result = subprocess.run(['vtracer', '--help'], 
-                              capture_output=True, text=True, check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        result = subprocess.run([path, '--version'], capture_output=True, text=True)
+        if result.returncode != 0:
+            # Older builds may not know --version
+            result = subprocess.run([path, '--help'], capture_output=True, text=True, check=True)
+            return 'unknown'
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[0] if lines else 'unknown'
+
+def _load_probe_cache():
+    try:
+        with open(default_cache_dir() / 'vtracer-probe.json') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_probe_cache(probes):
+    path = default_cache_dir() / 'vtracer-probe.json'
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(probes, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # the probe cache is only an optimization
+
+def resolve_vtracer(explicit=None):
+    """
+    Locate VTracer and return (path, version), or None if it cannot be found.
+    Lookup order: explicit path, $VTRACER_PATH, the bundled binary, PATH.
+    Probe results are cached on disk keyed on the binary's mtime and size, so
+    only the first run after installing or upgrading VTracer spawns it.
+    """
+    global _resolved_vtracer
+    if _resolved_vtracer is not None and explicit is None:
+        return _resolved_vtracer
+    
+    probes = _load_probe_cache()
+    for candidate in _vtracer_candidates(explicit):
+        path = shutil.which(candidate) or candidate
+        if not os.path.isfile(path) or not os.access(path, os.X_OK):
+            continue
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        cached = probes.get(path)
+        if cached and cached['stamp'] == stamp:
+            version = cached['version']
+        else:
+            version = _probe_vtracer(path)
+            if version is None:
+                continue
+            probes[path] = {'stamp': stamp, 'version': version}
+            _save_probe_cache(probes)
+        _resolved_vtracer = (path, version)
+        return _resolved_vtracer
+    return None
+
+def check_vtracer_installed(explicit=None):
+    """Check if VTracer is installed and accessible"""
+    return resolve_vtracer(explicit) is not None
+
+def get_vtracer_version():
+    """Return the version string of the resolved VTracer binary"""
+    resolved = resolve_vtracer()
+    return resolved[1] if resolved else 'unknown'
+
+def vtracer_binary():
+    """Path of the VTracer binary to run"""
+    resolved = resolve_vtracer()
+    return resolved[0] if resolved else 'vtracer'
 
 def install_vtracer():
     """Provide instructions for installing VTracer"""
     print("\nVTracer is not installed or not found in PATH.")
+    print(f"If it is installed elsewhere, pass --vtracer PATH or set {VTRACER_ENV}.")
     print("To install VTracer:")
     print("1. Install Rust: https://rustup.rs/")
     print("2. Install VTracer: cargo install vtracer")
     print("3. Or download prebuilt binaries from: https://github.com/visioncortex/vtracer")
     return False
 
-def vectorize_image(input_path, output_path=None, colormode='color', hierarchical='stacked', 
-                   mode='spline', filter_speckle=4, color_precision=6, gradient_step=55,
-                   corner_threshold=105, segment_length=7.5, splice_threshold=0):
+def default_cache_dir():
+    """Per-user cache location for traced SVGs"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'vtracer-gui'
+
+def file_digest(path):
+    """sha256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# vectorize_image() options besides VTracer's own that change the file it writes
+OUTPUT_OPTIONS = ('max_pixels', 'max_dimension', 'tile_size', 'tile_overlap', 'palette',
+                  'optimize_precision', 'compress_level')
+
+def output_settings(vparams):
     """
-    Vectorize a single image using VTracer with your specified parameters
+    The part of a set of vectorize_image() options that determines its output:
+    all VTracer parameters plus whichever output options are in effect. Cache
+    keys, manifests and timing history all compare results by this.
     """
-    input_path = Path(input_path)
-    
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-    
-    # Generate output path if not provided
-    if output_path is None:
-        output_path = input_path.with_suffix('.svg')
+    settings = {k: vparams.get(k, v) for k, v in VTRACER_DEFAULTS.items()}
+    for name in OUTPUT_OPTIONS:
+        if vparams.get(name) is not None:
+            settings[name] = vparams[name]
+    if 'tile_size' in settings:
+        settings.setdefault('tile_overlap', 32)
     else:
-        output_path = Path(output_path)
-    
-    # Build VTracer command with your specified parameters
-    cmd = [
-        'vtracer',
+        settings.pop('tile_overlap', None)
+    if settings['colormode'] != 'color':
+        settings.pop('palette', None)  # binary images are never quantized
+    return settings
+
+def canonical_params(params):
+    """Stable text form of a parameter set"""
+    # Compare parameters the way vtracer sees them, so 4 and '4' match
+    return json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True)
+
+class ResultCache:
+    """
+    On-disk SVG cache keyed by input content, VTracer parameters and VTracer
+    version. Entries are evicted least-recently-used first once the cache
+    grows past max_bytes.
+    """
+    def __init__(self, cache_dir=None, max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def key(self, input_path, params):
+        """Hash the input bytes together with the canonical parameter set"""
+        digest = hashlib.sha256(file_digest(input_path).encode())
+        digest.update(canonical_params(params).encode())
+        digest.update(get_vtracer_version().encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return self.cache_dir / key[:2] / f"{key}.svg"
+
+    def fetch(self, key, output_path):
+        """Copy a cached SVG to output_path; returns False on a miss"""
+        entry = self._entry(key)
+        try:
+            shutil.copyfile(entry, output_path)
+            os.utime(entry)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key, output_path):
+        """Add a freshly traced SVG to the cache"""
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(output_path, tmp)
+        os.replace(tmp, entry)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += entry.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith('.svg'):
+                    st = entry.stat()
+                    yield entry.path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        # Drop oldest entries until we are comfortably under the cap
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+def build_vtracer_command(input_path, output_path, colormode='color', hierarchical='stacked',
+                          mode='spline', filter_speckle=4, color_precision=6, gradient_step=55,
+                          corner_threshold=105, segment_length=7.5, splice_threshold=0):
+    """Build the VTracer command line for one conversion"""
+    return [
+        vtracer_binary(),
         '--input', str(input_path),
         '--output', str(output_path),
         '--colormode', colormode,
@@ -63,13 +302,909 @@ def vectorize_image(input_path, output_path=None, colormode='color', hierarchica
         '--segment_length', str(segment_length),
         '--splice_threshold', str(splice_threshold)
     ]
+
+class ConversionTimeout(subprocess.TimeoutExpired):
+    """VTracer ran past its per-job timeout and was killed"""
+    def __str__(self):
+        return f"VTracer timed out after {self.timeout:g} seconds"
+
+class ResourceLimitExceeded(subprocess.CalledProcessError):
+    """VTracer was stopped by its CPU-time or memory limit"""
+    def __init__(self, limit, returncode, cmd, output=None, stderr=None):
+        super().__init__(returncode, cmd, output, stderr)
+        self.limit = limit
+
+    def __str__(self):
+        return f"VTracer exceeded its {self.limit} limit"
+
+class ConversionCancelled(Exception):
+    """The batch was cancelled and the running VTracer process was killed"""
+    def __str__(self):
+        return "Cancelled"
+
+class BatchControl:
+    """
+    Pause, resume and cancel for a running batch. The dispatcher calls wait()
+    before starting each job; run_vtracer() attaches a kill function for every
+    child it starts, so cancel() stops work that is already in flight too.
+    """
+    def __init__(self):
+        self.cancelled = False
+        self._running = threading.Event()
+        self._running.set()
+        self._lock = threading.Lock()
+        self._kills = set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            kills = list(self._kills)
+        self._running.set()  # wake a paused dispatcher so it can see the cancel
+        for kill in kills:
+            kill()
+
+    def wait(self):
+        """Block while paused; False once the batch is cancelled"""
+        self._running.wait()
+        return not self.cancelled
+
+    def attach(self, kill):
+        """Register a child's kill function; calls it at once if already cancelled"""
+        with self._lock:
+            self._kills.add(kill)
+            cancelled = self.cancelled
+        if cancelled:
+            kill()
+        return kill
+
+    def detach(self, kill):
+        with self._lock:
+            self._kills.discard(kill)
+
+def _rlimits(cpu_limit=None, memory_limit=None):
+    """(resource, soft, hard) CPU-seconds and address-space limits for a child"""
+    import resource
+    limits = []
+    if cpu_limit:
+        # SIGXCPU at the soft limit, SIGKILL a second later
+        limits.append((resource.RLIMIT_CPU, math.ceil(cpu_limit), math.ceil(cpu_limit) + 1))
+    if memory_limit:
+        limits.append((resource.RLIMIT_AS, int(memory_limit), int(memory_limit)))
+    # Never ask for more than the current hard limit; the child could not raise it
+    clamped = []
+    for which, soft, hard in limits:
+        current = resource.getrlimit(which)[1]
+        if current != resource.RLIM_INFINITY:
+            soft, hard = min(soft, current), min(hard, current)
+        clamped.append((which, soft, hard))
+    return clamped
+
+def _limited_command(cmd, rlimits):
+    """
+    Wrap cmd in a shell that sets the limits and execs it, for systems
+    without prlimit(). preexec_fn would do the same but can deadlock when
+    other threads are running, as they are in a batch.
+    """
+    import resource
+    flags = {resource.RLIMIT_CPU: '-t', resource.RLIMIT_AS: '-v'}
+    script = []
+    for which, soft, hard in rlimits:
+        # ulimit -v counts kilobytes
+        scale = 1024 if which == resource.RLIMIT_AS else 1
+        # Soft first: lowering the hard limit below the current soft one fails
+        script.append(f"ulimit -S {flags[which]} {soft // scale} && ulimit -H {flags[which]} {hard // scale}")
+    return ['/bin/sh', '-c', ' && '.join(script) + ' && exec "$@"', 'vtracer', *map(str, cmd)]
+
+def _limit_command(cmd, cpu_limit=None, memory_limit=None):
+    """
+    (command to start, rlimits to set on it with _apply_prlimits()). On Linux
+    the limits are set from outside once the child is running; elsewhere the
+    command is wrapped to set them itself.
+    """
+    if os.name != 'posix' or not (cpu_limit or memory_limit):
+        return cmd, None
+    import resource
+    rlimits = _rlimits(cpu_limit, memory_limit)
+    if hasattr(resource, 'prlimit'):
+        return cmd, rlimits
+    return _limited_command(cmd, rlimits), None
+
+def _apply_prlimits(pid, rlimits):
+    # Set from here rather than in a preexec_fn, which is unsafe with threads
+    import resource
+    for which, soft, hard in rlimits:
+        try:
+            resource.prlimit(pid, which, (soft, hard))
+        except ProcessLookupError:
+            pass  # already exited
+
+def _check_returncode(returncode, cmd, stdout, stderr, cpu_limit=None, memory_limit=None):
+    """Raise the right CalledProcessError for a failed VTracer run"""
+    if returncode == 0:
+        return
+    if cpu_limit and os.name == 'posix' and returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        raise ResourceLimitExceeded('CPU time', returncode, cmd, stdout, stderr)
+    if memory_limit and os.name == 'posix' and (
+            'memory allocation' in stderr or returncode in (-signal.SIGABRT, -signal.SIGSEGV)):
+        raise ResourceLimitExceeded('memory', returncode, cmd, stdout, stderr)
+    raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
+
+def _kill_process_group(proc):
+    """Kill a child and everything it started"""
+    try:
+        if os.name == 'posix':
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def run_vtracer(cmd, metrics=None, timeout=None, cpu_limit=None, memory_limit=None, control=None):
+    """
+    Run a VTracer command, raising CalledProcessError on failure.
+    If a metrics dict is given it receives the spawn time, child wall time,
+    child user/sys CPU seconds and peak RSS in bytes (where the OS reports them).
+    A child running longer than `timeout` seconds is killed along with its
+    process group and ConversionTimeout is raised. cpu_limit (seconds) and
+    memory_limit (bytes) are applied as rlimits on POSIX systems (prlimit on
+    Linux, a ulimit wrapper elsewhere); hitting them raises
+    ResourceLimitExceeded. With a BatchControl, cancelling the
+    batch kills the child the same way and raises ConversionCancelled.
+    """
+    popen_args = {}
+    if os.name == 'posix' and (timeout or control is not None):
+        # Own process group, so a timeout or cancel can kill everything VTracer started
+        popen_args['start_new_session'] = True
+    spawn_cmd, prlimits = _limit_command(cmd, cpu_limit, memory_limit)
     
+    # Output goes to temporary files rather than pipes so the child can be
+    # reaped with os.wait4(), which also returns its resource usage
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(spawn_cmd, stdout=out, stderr=err, **popen_args)
+        if prlimits:
+            _apply_prlimits(proc.pid, prlimits)
+        spawned = time.perf_counter()
+        
+        lock = threading.Lock()
+        state = {'reaped': False, 'timed_out': False, 'cancelled': False}
+        def kill(reason):
+            with lock:
+                if not state['reaped']:
+                    state[reason] = True
+                    _kill_process_group(proc)
+        timer = threading.Timer(timeout, kill, ('timed_out',)) if timeout else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        on_cancel = control.attach(lambda: kill('cancelled')) if control is not None else None
+        try:
+            if hasattr(os, 'wait4'):
+                if hasattr(os, 'waitid'):
+                    # Wait for the exit without reaping: until wait4() below the
+                    # pid stays a zombie, so a kill landing now can't hit a reused pid
+                    os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+                    with lock:
+                        state['reaped'] = True
+                _, status, usage = os.wait4(proc.pid, 0)
+                returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            else:
+                returncode = proc.wait()
+                usage = None
+            with lock:
+                state['reaped'] = True
+                proc.returncode = returncode
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if on_cancel is not None:
+                control.detach(on_cancel)
+        finished = time.perf_counter()
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode(errors='replace')
+        stderr = err.read().decode(errors='replace')
+    
+    if metrics is not None:
+        metrics['spawn'] = spawned - start
+        metrics['child_wall'] = finished - spawned
+        if usage is not None:
+            metrics['child_user'] = usage.ru_utime
+            metrics['child_sys'] = usage.ru_stime
+            # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+            metrics['max_rss'] = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    
+    # A kill that raced with a clean exit doesn't turn it into a failure
+    if state['cancelled'] and proc.returncode != 0:
+        raise ConversionCancelled()
+    if state['timed_out'] and proc.returncode != 0:
+        raise ConversionTimeout(cmd, timeout, stdout, stderr)
+    _check_returncode(proc.returncode, cmd, stdout, stderr, cpu_limit, memory_limit)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+def read_image_size(path):
+    """
+    (width, height) of an image, read from the file header without decoding
+    it. Falls back to Pillow for other formats; returns None if unknown or
+    the header is truncated.
+    """
+    try:
+        size = _read_header_size(path)
+    except struct.error:
+        return None  # truncated or malformed header
+    if size is not None:
+        return size
+    try:
+        from PIL import Image
+        with Image.open(path) as im:
+            return im.size
+    except Exception:
+        return None
+
+def _read_header_size(path):
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head.startswith(b'BM'):
+            width, height = struct.unpack('<ii', head[18:26])
+            return width, abs(height)
+        if head.startswith(b'\xff\xd8'):
+            # Walk the JPEG segments up to the first start-of-frame marker
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xff:
+                    break
+                length = struct.unpack('>H', f.read(2))[0]
+                if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, 1)
+    return None
+
+def require_pillow(feature):
+    """Import Pillow for an optional feature, with install instructions if missing"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(f"{feature} needs Pillow: pip install pillow") from None
+    return Image
+
+def require_numpy(feature):
+    """Import NumPy for an optional feature, with install instructions if missing"""
     try:
-        print(f"Vectorizing: {input_path.name}")
-        print(f"Command: {' '.join(cmd)}")
+        import numpy
+    except ImportError:
+        raise RuntimeError(f"{feature} needs NumPy: pip install numpy") from None
+    return numpy
+
+def median_cut_palette(pixels, colors):
+    """Median-cut palette of up to `colors` entries for an (N, 3) uint8 array"""
+    np = require_numpy('Color quantization')
+    boxes = [(pixels, np.ptp(pixels, axis=0))]
+    while len(boxes) < colors:
+        # Split the box with the widest spread in any channel at its median
+        i = max(range(len(boxes)), key=lambda j: boxes[j][1].max())
+        box, spread = boxes[i]
+        if spread.max() == 0:
+            break
+        channel = int(spread.argmax())
+        half = len(box) // 2
+        order = np.argpartition(box[:, channel], half)
+        boxes[i:i + 1] = [(part, np.ptp(part, axis=0)) for part in (box[order[:half]], box[order[half:]])]
+    return np.array([box.mean(axis=0) for box, _ in boxes]).round().astype(np.uint8)
+
+def quantize_colors(input_path, output_path, colors, sample_size=1 << 18):
+    """
+    Reduce an image to a palette of `colors` colors and save it as PNG.
+    The palette is built by median cut from a fixed-seed pixel sample, then
+    each distinct color is mapped to its nearest palette color in vectorized
+    chunks.
+    Alpha is kept as is.
+    """
+    Image = require_pillow('Color quantization')
+    np = require_numpy('Color quantization')
+    Image.MAX_IMAGE_PIXELS = None
+    with Image.open(input_path) as im:
+        im = im.convert('RGBA')
+    rgba = np.asarray(im)
+    pixels = rgba[..., :3].reshape(-1, 3)
+    
+    sample = pixels
+    if len(pixels) > sample_size:
+        sample = pixels[np.random.default_rng(0).choice(len(pixels), sample_size, replace=False)]
+    palette = median_cut_palette(sample, colors)
+    
+    # Map each distinct color once rather than every pixel
+    packed = (pixels[:, 0].astype(np.uint32) << 16) | (pixels[:, 1].astype(np.uint32) << 8) | pixels[:, 2]
+    unique, inverse = np.unique(packed, return_inverse=True)
+    del packed
+    colors_rgb = np.stack([unique >> 16, (unique >> 8) & 0xff, unique & 0xff], axis=1).astype(np.float32)
+    # |c - p|^2 ranks like |p|^2 - 2 c.p; every term is an integer below 2**24,
+    # so float32 matrix products give exactly the brute-force answer
+    pal = palette.astype(np.float32)
+    pal_sq = (pal ** 2).sum(axis=1)
+    nearest = np.empty(len(unique), dtype=np.intp)
+    chunk = max(1, (4 * 1024 * 1024) // len(pal))
+    for start in range(0, len(unique), chunk):
+        distances = pal_sq - 2 * (colors_rgb[start:start + chunk] @ pal.T)
+        nearest[start:start + chunk] = distances.argmin(axis=1)
+    
+    out = np.empty_like(rgba)
+    out[..., :3] = palette[nearest[inverse.reshape(-1)]].reshape(rgba.shape[:2] + (3,))
+    out[..., 3] = rgba[..., 3]
+    # A scratch file VTracer reads once; fast compression beats a small file
+    Image.fromarray(out, 'RGBA').save(output_path, compress_level=1)
+    return output_path
+
+def fit_pixel_budget(size, max_pixels=None, max_dimension=None):
+    """Size to downscale to so both budgets are met, or None if it already fits"""
+    width, height = size
+    scale = 1.0
+    if max_pixels and width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+    if max_dimension and max(width, height) * scale > max_dimension:
+        scale = max_dimension / max(width, height)
+    if scale >= 1.0:
+        return None
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+def resample_image(input_path, output_path, size):
+    """Write a resized PNG copy of an image"""
+    Image = require_pillow('Downscaling')
+    Image.MAX_IMAGE_PIXELS = None
+    with Image.open(input_path) as im:
+        if im.mode not in ('1', 'L', 'LA', 'RGB', 'RGBA'):
+            im = im.convert('RGBA')
+        im.resize(size, Image.LANCZOS).save(output_path)
+    return output_path
+
+def restore_svg_size(svg_path, size, traced_size):
+    """
+    Make an SVG traced from a downscaled copy render at the original size by
+    setting width/height to the original and the viewBox to the traced size.
+    Only the root tag is rewritten; the rest of the file is streamed across.
+    """
+    svg_path = Path(svg_path)
+    tmp = svg_path.with_name(f"{svg_path.name}.{os.getpid()}.tmp")
+    with open(svg_path, 'r', encoding='utf-8') as src, open(tmp, 'w', encoding='utf-8') as dst:
+        head = src.read(64 * 1024)
+        match = re.search(r'<svg\b[^>]*>', head)
+        if match is None:
+            raise ValueError(f"No <svg> element in {svg_path}")
+        tag = match.group(0)
+        tag = re.sub(r'\swidth="[^"]*"', f' width="{size[0]}"', tag)
+        tag = re.sub(r'\sheight="[^"]*"', f' height="{size[1]}"', tag)
+        if 'viewBox=' not in tag:
+            tag = tag[:-1].rstrip('/') + f' viewBox="0 0 {traced_size[0]} {traced_size[1]}">'
+        dst.write(head[:match.start()] + tag + head[match.end():])
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, svg_path)
+
+def _tile_starts(length, tile_size, overlap):
+    step = max(1, tile_size - overlap)
+    starts = [0]
+    while starts[-1] + tile_size < length:
+        starts.append(starts[-1] + step)
+    return starts
+
+def _svg_children(svg_path):
+    """Serialized child elements of an SVG file, without namespace prefixes"""
+    root = ET.parse(svg_path).getroot()
+    for el in root.iter():
+        if isinstance(el.tag, str) and '}' in el.tag:
+            el.tag = el.tag.split('}', 1)[1]
+    for child in root:
+        yield ET.tostring(child, encoding='unicode').strip()
+
+def vectorize_tiled(input_path, output_path, tile_size=2048, overlap=32, jobs=None,
+                    metrics=None, limits=None, **params):
+    """
+    Trace a large image as overlapping tiles in parallel and stitch them into
+    one SVG. Each tile is clipped halfway into its overlap with its neighbours,
+    so seams fall where both tiles saw the full surrounding context.
+    At most `jobs` tiles are traced at once (default: one per CPU).
+    `limits` holds run_vtracer() timeout/cpu_limit/memory_limit/control
+    settings. The CPU and memory limits apply per tile process; the timeout
+    is one deadline for the whole image. The first tile to fail stops the rest.
+    """
+    Image = require_pillow('Tiled vectorization')
+    Image.MAX_IMAGE_PIXELS = None  # huge scans are the point of tiling
+    with Image.open(input_path) as im:
+        if im.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            im = im.convert('RGBA')
+        width, height = im.size
+        xs = _tile_starts(width, tile_size, overlap)
+        ys = _tile_starts(height, tile_size, overlap)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            tiles = []
+            for row, y0 in enumerate(ys):
+                for col, x0 in enumerate(xs):
+                    x1, y1 = min(x0 + tile_size, width), min(y0 + tile_size, height)
+                    tile_path = Path(tmp) / f"{row}_{col}.png"
+                    im.crop((x0, y0, x1, y1)).save(tile_path)
+                    # Visible part of the tile: up to the middle of each overlap,
+                    # plus half a pixel so antialiasing leaves no hairline gaps
+                    left = 0 if col == 0 else overlap / 2 - 0.5
+                    top = 0 if row == 0 else overlap / 2 - 0.5
+                    right = x1 - x0 if col == len(xs) - 1 else x1 - x0 - overlap / 2 + 0.5
+                    bottom = y1 - y0 if row == len(ys) - 1 else y1 - y0 - overlap / 2 + 0.5
+                    tiles.append((f"tile-{row}-{col}", tile_path, x0, y0,
+                                  (left, top, right - left, bottom - top)))
+            
+            tile_metrics = [{} for _ in tiles]
+            limits = dict(limits or {})
+            timeout = limits.pop('timeout', None)
+            deadline = time.monotonic() + timeout if timeout else None
+            # Cancelling the batch, or any tile failing, kills the tiles still running
+            tiles_control = BatchControl()
+            outer = limits.pop('control', None)
+            hook = outer.attach(tiles_control.cancel) if outer is not None else None
+            def trace(i):
+                _, tile_path, _, _, _ = tiles[i]
+                cmd = build_vtracer_command(tile_path, tile_path.with_suffix('.svg'), **params)
+                if tiles_control.cancelled:
+                    raise ConversionCancelled()
+                try:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise ConversionTimeout(cmd, timeout)
+                    run_vtracer(cmd, tile_metrics[i], timeout=remaining, control=tiles_control, **limits)
+                except ConversionTimeout as e:
+                    tiles_control.cancel()
+                    raise ConversionTimeout(cmd, timeout, e.output, e.stderr)
+                except ConversionCancelled:
+                    raise
+                except Exception:
+                    tiles_control.cancel()
+                    raise
+            try:
+                with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                    futures = [pool.submit(trace, i) for i in range(len(tiles))]
+                errors = [f.exception() for f in futures if f.exception() is not None]
+            finally:
+                if hook is not None:
+                    outer.detach(hook)
+            if errors:
+                # Report the tile that failed, not the siblings stopped because of it
+                raise next((e for e in errors if not isinstance(e, ConversionCancelled)), errors[0])
+            
+            with open(output_path, 'w', encoding='utf-8') as out:
+                out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                out.write(f'<svg version="1.1" xmlns="http://www.w3.org/2000/svg" '
+                          f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n<defs>\n')
+                for tile_id, _, _, _, (x, y, w, h) in tiles:
+                    out.write(f'<clipPath id="{tile_id}"><rect x="{x:g}" y="{y:g}" '
+                              f'width="{w:g}" height="{h:g}"/></clipPath>\n')
+                out.write('</defs>\n')
+                for tile_id, tile_path, x0, y0, _ in tiles:
+                    out.write(f'<g transform="translate({x0},{y0})" clip-path="url(#{tile_id})">\n')
+                    for child in _svg_children(tile_path.with_suffix('.svg')):
+                        out.write(child + '\n')
+                    out.write('</g>\n')
+                out.write('</svg>\n')
+    
+    if metrics is not None:
+        metrics['tiles'] = len(tiles)
+        for field in ('spawn', 'child_wall', 'child_user', 'child_sys'):
+            if any(field in m for m in tile_metrics):
+                metrics[field] = sum(m.get(field, 0) for m in tile_metrics)
+        if any('max_rss' in m for m in tile_metrics):
+            metrics['max_rss'] = max(m.get('max_rss', 0) for m in tile_metrics)
+    return output_path
+
+_PATH_TOKEN = re.compile(r'[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_PATH_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7}
+_TRANSLATE = re.compile(r'^\s*translate\(\s*([-+.\deE]+)(?:[\s,]+([-+.\deE]+))?\s*\)\s*$')
+_HEX_COLOR = re.compile(r'^#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3$')
+_HEX_VALUE = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+
+# Attributes that only restate the SVG default
+_DEFAULT_ATTRIBUTES = {
+    'opacity': '1',
+    'fill-opacity': '1',
+    'stroke-opacity': '1',
+    'fill-rule': 'nonzero',
+    'stroke': 'none',
+    'stroke-width': '1',
+}
+# Of those, the ones children inherit: a default value there may be undoing an ancestor's
+_INHERITED = frozenset(_DEFAULT_ATTRIBUTES) - {'opacity'}
+
+def _parse_path(d):
+    """Parse path data into (command, absolute arguments) segments"""
+    tokens = _PATH_TOKEN.findall(d)
+    segments = []
+    cmd = None
+    x = y = start_x = start_y = 0.0
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+            if cmd in 'Zz':
+                segments.append(('Z', []))
+                x, y = start_x, start_y
+                continue
+        if cmd is None or cmd in 'Zz':
+            raise ValueError(f"Unexpected number in path data: {tokens[i]}")
+        upper = cmd.upper()
+        count = _PATH_ARGS[upper]
+        args = [float(t) for t in tokens[i:i + count]]
+        if len(args) < count:
+            raise ValueError("Truncated path data")
+        i += count
+        rel = cmd.islower()
+        if upper == 'H':
+            args = [args[0] + x if rel else args[0]]
+            x = args[0]
+        elif upper == 'V':
+            args = [args[0] + y if rel else args[0]]
+            y = args[0]
+        else:
+            if rel:
+                if upper == 'A':
+                    args[5] += x
+                    args[6] += y
+                else:
+                    args = [v + (x if j % 2 == 0 else y) for j, v in enumerate(args)]
+            x, y = args[-2], args[-1]
+        segments.append((upper, args))
+        if upper == 'M':
+            start_x, start_y = x, y
+            cmd = 'l' if rel else 'L'  # extra pairs after a moveto are linetos
+    return segments
+
+def _format_number(value, precision):
+    text = f"{value:.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+def _join_numbers(numbers):
+    out = ''
+    previous = ''
+    for text in numbers:
+        # Separators are only needed where the numbers would otherwise merge
+        if out and not text.startswith('-') and not (text.startswith('.') and '.' in previous):
+            out += ' '
+        out += text
+        previous = text
+    return out
+
+def _format_path(segments, precision, dx=0.0, dy=0.0):
+    """
+    Shortest path data for absolute segments, shifted by (dx, dy). Each segment
+    is written in absolute or relative form, whichever is shorter; relative
+    offsets are taken between already rounded points so errors never add up.
+    """
+    out = []
+    last_cmd = None
+    x = y = start_x = start_y = 0.0
+    for cmd, args in segments:
+        if cmd == 'Z':
+            out.append('z')
+            last_cmd = 'z'
+            x, y = start_x, start_y
+            continue
+        if cmd == 'H':
+            points = [round(args[0] + dx, precision)]
+        elif cmd == 'V':
+            points = [round(args[0] + dy, precision)]
+        elif cmd == 'A':
+            points = ([round(v, precision) for v in args[:3]] + [int(args[3]), int(args[4])]
+                      + [round(args[5] + dx, precision), round(args[6] + dy, precision)])
+        else:
+            points = [round(v + (dx if j % 2 == 0 else dy), precision) for j, v in enumerate(args)]
+        
+        if cmd == 'L' and points[1] == y:
+            cmd, points = 'H', [points[0]]
+        elif cmd == 'L' and points[0] == x:
+            cmd, points = 'V', [points[1]]
+        
+        if cmd == 'H':
+            relative = [points[0] - x]
+        elif cmd == 'V':
+            relative = [points[0] - y]
+        elif cmd == 'A':
+            relative = points[:5] + [points[5] - x, points[6] - y]
+        else:
+            relative = [v - (x if j % 2 == 0 else y) for j, v in enumerate(points)]
+        
+        candidates = []
+        for letter, values in ((cmd, points), (cmd.lower(), relative)):
+            text = _join_numbers(_format_number(round(v, precision), precision) for v in values)
+            if letter != last_cmd or letter in 'Mm':
+                text = letter + text
+            elif not text.startswith('-'):
+                text = ' ' + text
+            candidates.append((len(text), letter, text))
+        _, letter, text = min(candidates)
+        out.append(text)
+        last_cmd = letter
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        if cmd == 'H':
+            x = points[0]
+        elif cmd == 'V':
+            y = points[0]
+        else:
+            x, y = points[-2], points[-1]
+        if cmd == 'M':
+            start_x, start_y = x, y
+    return ''.join(out)
+
+def _escape(text, quote=False):
+    # xml.sax.saxutils.escape() would pull in urllib and http.client at startup
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return text.replace('"', '&quot;') if quote else text
+
+def _inherited_overrides(attrs, overridden):
+    """Inherited properties with a non-default value below an element"""
+    if 'style' in attrs:
+        return _INHERITED  # CSS could set any of them
+    result = set(overridden)
+    for name in _INHERITED:
+        if name in attrs:
+            if attrs[name].strip() == _DEFAULT_ATTRIBUTES[name]:
+                result.discard(name)
+            else:
+                result.add(name)
+    return frozenset(result)
+
+def _optimize_attributes(tag, attrs, precision, overridden=frozenset()):
+    """
+    Shortened attributes of one element. `overridden` names the inherited
+    properties an ancestor sets to something other than their default;
+    an explicit default for those is kept, since it undoes the ancestor's.
+    """
+    attrs = dict(attrs)
+    if tag == 'svg':
+        attrs.pop('version', None)
+    for name, default in _DEFAULT_ATTRIBUTES.items():
+        if attrs.get(name, '').strip() == default and name not in overridden:
+            del attrs[name]
+    for name in ('fill', 'stroke'):
+        value = attrs.get(name, '').strip()
+        # Only hex colors; url(#Id) references are case-sensitive
+        if _HEX_VALUE.match(value):
+            attrs[name] = _HEX_COLOR.sub(r'#\1\2\3', value.lower())
+    match = _TRANSLATE.match(attrs.get('transform', ''))
+    if match and float(match.group(1)) == 0 and float(match.group(2) or 0) == 0:
+        del attrs['transform']
+        match = None
+    if tag == 'path' and 'd' in attrs:
+        dx = dy = 0.0
+        if match:
+            # Fold a plain translate into the coordinates
+            dx, dy = float(match.group(1)), float(match.group(2) or 0)
+        try:
+            attrs['d'] = _format_path(_parse_path(attrs['d']), precision, dx, dy)
+            if match:
+                del attrs['transform']
+        except ValueError:
+            pass
+    return attrs
+
+def optimize_svg(svg_path, precision=2):
+    """
+    Shrink an SVG in place: round coordinates to `precision` decimals, write
+    path data in its shortest absolute/relative form, fold translate
+    transforms into paths, shorten colors and drop attributes that restate
+    defaults. The file is streamed element by element, so memory use does not
+    grow with its size. Comments and text inside non-leaf elements are dropped.
+    Returns (bytes before, bytes after).
+    """
+    svg_path = Path(svg_path)
+    before = svg_path.stat().st_size
+    tmp = svg_path.with_name(f"{svg_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    namespaces = {}
+    
+    def qualify(name):
+        if name.startswith('{'):
+            uri, local = name[1:].split('}', 1)
+            prefix = namespaces.get(uri, '')
+            return f"{prefix}:{local}" if prefix else local
+        return name
+    
+    try:
+        with open(tmp, 'w', encoding='utf-8') as out:
+            stack = []
+            inherited = [frozenset()]  # overridden inherited properties at each depth
+            pending = None  # start tag not yet closed, until we know if it has children
+            for event, item in ET.iterparse(svg_path, events=('start-ns', 'start', 'end')):
+                if event == 'start-ns':
+                    prefix, uri = item
+                    namespaces[uri] = prefix
+                elif event == 'start':
+                    if pending:
+                        out.write(pending + '>')
+                    tag = qualify(item.tag)
+                    attrs = {qualify(k): v for k, v in item.attrib.items()}
+                    inherited.append(_inherited_overrides(attrs, inherited[-1]))
+                    attrs = _optimize_attributes(tag, attrs, precision, inherited[-2])
+                    pending = '<' + tag
+                    if not stack:
+                        for uri, prefix in namespaces.items():
+                            pending += f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"'
+                    for name, value in attrs.items():
+                        pending += f' {name}="{_escape(value, quote=True)}"'
+                    stack.append(item)
+                else:
+                    tag = qualify(item.tag)
+                    text = (item.text or '').strip()
+                    if pending and text:
+                        out.write(f"{pending}>{_escape(text)}</{tag}>")
+                    elif pending:
+                        out.write(pending + '/>')
+                    else:
+                        out.write(f"</{tag}>")
+                    pending = None
+                    stack.pop()
+                    inherited.pop()
+                    item.clear()
+                    if stack:
+                        del stack[-1][-1]  # finished children are not needed again
+            out.write('\n')
+        os.replace(tmp, svg_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return before, svg_path.stat().st_size
+
+def compress_svg(svg_path, output_path, level=9):
+    """Stream an SVG into a gzip-compressed SVGZ file"""
+    with open(svg_path, 'rb') as src, open(output_path, 'wb') as raw:
+        # An empty filename keeps the scratch file's name out of the gzip header
+        with gzip.GzipFile(filename='', mode='wb', compresslevel=level, fileobj=raw) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    return output_path
+
+def vectorize_image(input_path, output_path=None, colormode='color', hierarchical='stacked', 
+                   mode='spline', filter_speckle=4, color_precision=6, gradient_step=55,
+                   corner_threshold=105, segment_length=7.5, splice_threshold=0, cache=None,
+                   metrics=None, tile_size=None, tile_overlap=32, max_pixels=None,
+                   max_dimension=None, palette=None, optimize_precision=None,
+                   compress_level=None, timeout=None, cpu_limit=None, memory_limit=None,
+                   control=None, tile_jobs=None):
+    """
+    Vectorize a single image using VTracer with your specified parameters
+    If a ResultCache is given, identical earlier conversions are reused.
+    If a metrics dict is given, stage timings and the output size are recorded in it.
+    Images over max_pixels or max_dimension are traced from a downscaled copy
+    and the SVG is scaled back up to the original size.
+    With a palette size, color images are first quantized to that many colors.
+    With optimize_precision, the SVG is rewritten by optimize_svg().
+    With compress_level, output_path is written as gzip-compressed SVGZ.
+    timeout, cpu_limit and memory_limit bound each VTracer process, and a
+    BatchControl can cancel it (see run_vtracer()).
+    Images wider or taller than tile_size are traced in tiles, up to tile_jobs
+    at a time (see vectorize_tiled()).
+    """
+    input_path = Path(input_path)
+    
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    # Generate output path if not provided
+    if output_path is None:
+        output_path = input_path.with_suffix('.svg')
+    else:
+        output_path = Path(output_path)
+    
+    params = dict(
+        colormode=colormode,
+        hierarchical=hierarchical,
+        mode=mode,
+        filter_speckle=filter_speckle,
+        color_precision=color_precision,
+        gradient_step=gradient_step,
+        corner_threshold=corner_threshold,
+        segment_length=segment_length,
+        splice_threshold=splice_threshold
+    )
+    
+    size = scaled_size = None
+    if tile_size or max_pixels or max_dimension:
+        size = read_image_size(input_path)
+    if size is not None:
+        scaled_size = fit_pixel_budget(size, max_pixels, max_dimension)
+    trace_size = scaled_size or size
+    tiled = bool(tile_size and trace_size and max(trace_size) > tile_size)
+    quantize = bool(palette) and colormode == 'color'
+    
+    if cache is not None:
+        key = cache.key(input_path, output_settings(dict(
+            params, max_pixels=max_pixels, max_dimension=max_dimension, palette=palette,
+            tile_size=tile_size, tile_overlap=tile_overlap,
+            optimize_precision=optimize_precision, compress_level=compress_level)))
+    
+    # Everything is written to a scratch file next to output_path and renamed
+    # over it only on success, so a failed run never truncates or deletes the
+    # previous result of a re-traced input
+    partial = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if cache is not None and cache.fetch(key, partial):
+        os.replace(partial, output_path)
+        if metrics is not None:
+            metrics['cached'] = True
+            metrics['output_bytes'] = output_path.stat().st_size
+        print(f"✓ Cached: {input_path.name} -> {output_path}")
+        return output_path
+    
+    limits = dict(timeout=timeout, cpu_limit=cpu_limit, memory_limit=memory_limit, control=control)
+    try:
+        compress = compress_level is not None
+        with (tempfile.TemporaryDirectory() if scaled_size or quantize or compress else nullcontext()) as tmp:
+            # With compression, VTracer writes a scratch SVG that is gzipped into place
+            svg_path = Path(tmp) / 'output.svg' if compress else partial
+            trace_input = input_path
+            start = time.perf_counter()
+            if scaled_size:
+                print(f"Downscaling: {input_path.name} {size[0]}x{size[1]} -> {scaled_size[0]}x{scaled_size[1]}")
+                trace_input = resample_image(input_path, Path(tmp) / 'scaled.png', scaled_size)
+                if metrics is not None:
+                    metrics['trace_size'] = list(scaled_size)
+            if quantize:
+                print(f"Quantizing: {input_path.name} to {palette} colors")
+                trace_input = quantize_colors(trace_input, Path(tmp) / 'quantized.png', palette)
+            if metrics is not None and (scaled_size or quantize):
+                metrics['preprocess'] = time.perf_counter() - start
+            
+            if tiled:
+                print(f"Vectorizing: {input_path.name} in {tile_size}px tiles")
+                vectorize_tiled(trace_input, svg_path, tile_size, tile_overlap, jobs=tile_jobs,
+                                metrics=metrics, limits=limits, **params)
+            else:
+                # Build VTracer command with your specified parameters
+                cmd = build_vtracer_command(trace_input, svg_path, **params)
+                print(f"Vectorizing: {input_path.name}")
+                print(f"Command: {' '.join(cmd)}")
+                
+                result = run_vtracer(cmd, metrics, **limits)
+            
+            if scaled_size:
+                restore_svg_size(svg_path, size, scaled_size)
+            
+            if optimize_precision is not None:
+                before, after = optimize_svg(svg_path, optimize_precision)
+                print(f"Optimized: {output_path.name} {before} -> {after} bytes")
+                if metrics is not None:
+                    metrics['unoptimized_bytes'] = before
+            
+            if compress:
+                start = time.perf_counter()
+                compress_svg(svg_path, partial, compress_level)
+                if metrics is not None:
+                    metrics['compress'] = time.perf_counter() - start
+                    metrics['svg_bytes'] = svg_path.stat().st_size
         
+        os.replace(partial, output_path)
+        if cache is not None:
+            cache.store(key, output_path)
+        if metrics is not None:
+            metrics['output_bytes'] = output_path.stat().st_size
         print(f"✓ Successfully created: {output_path}")
         return output_path
         
@@ -77,9 +1212,115 @@ def vectorize_image(input_path, output_path=None, colormode='color', hierarchica
         print(f"✗ Error vectorizing {input_path.name}:")
         print(f"  {e.stderr}")
         raise
+    finally:
+        try:
+            os.remove(partial)
+        except FileNotFoundError:
+            pass
+
+def _async_params(params):
+    """The VTracer options in params; anything else vectorize_image_async() can't honour is refused"""
+    unsupported = sorted(k for k, v in params.items() if k not in VTRACER_DEFAULTS and v is not None)
+    if unsupported:
+        raise ValueError(f"vectorize_image_async() does not support {', '.join(unsupported)}; "
+                         f"use vectorize_image()")
+    return {k: v for k, v in params.items() if k in VTRACER_DEFAULTS}
+
+async def vectorize_image_async(input_path, output_path=None, semaphore=None, cache=None,
+                                metrics=None, timeout=None, cpu_limit=None, memory_limit=None,
+                                **params):
+    """
+    Async counterpart of vectorize_image().
+    VTracer runs as an asyncio subprocess, so no thread is held while it works.
+    Pass a shared asyncio.Semaphore to bound how many children run at once.
+    timeout, cpu_limit and memory_limit work as in run_vtracer(), and
+    cancelling the task kills VTracer's process group too. The Python-side
+    stages (downscaling, quantizing, tiling, optimizing, compressing) are
+    not available here; passing their options raises ValueError.
+    Metrics are limited to wall-clock stages; child CPU and RSS are not available.
+    """
+    import asyncio  # only the async backend pays for it, not every headless start
+    params = _async_params(params)
+    input_path = Path(input_path)
+    
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    if output_path is None:
+        output_path = input_path.with_suffix('.svg')
+    else:
+        output_path = Path(output_path)
+    
+    # Traced to a scratch file and renamed on success, as in vectorize_image()
+    partial = output_path.with_name(f".{output_path.name}.{os.getpid()}.{id(asyncio.current_task())}.tmp")
+    cmd = build_vtracer_command(input_path, partial, **params)
+    spawn_cmd, prlimits = _limit_command(cmd, cpu_limit, memory_limit)
+    popen_args = {'start_new_session': True} if os.name == 'posix' else {}
+    
+    try:
+        async with (semaphore or nullcontext()):
+            if cache is not None:
+                # Hashing and copying whole files would stall every other job on the loop
+                key = await asyncio.to_thread(cache.key, input_path, output_settings(params))
+                if await asyncio.to_thread(cache.fetch, key, partial):
+                    os.replace(partial, output_path)
+                    if metrics is not None:
+                        metrics['cached'] = True
+                        metrics['output_bytes'] = output_path.stat().st_size
+                    print(f"✓ Cached: {input_path.name} -> {output_path}")
+                    return output_path
+            
+            print(f"Vectorizing: {input_path.name}")
+            print(f"Command: {' '.join(cmd)}")
+            
+            start = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                *spawn_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                **popen_args)
+            if prlimits:
+                _apply_prlimits(proc.pid, prlimits)
+            spawned = time.perf_counter()
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if proc.returncode is None:
+                    _kill_process_group(proc)
+                await proc.wait()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise ConversionTimeout(cmd, timeout) from None
+                raise
+            if metrics is not None:
+                metrics['spawn'] = spawned - start
+                metrics['child_wall'] = time.perf_counter() - spawned
+        
+        stdout = stdout.decode(errors='replace')
+        stderr = stderr.decode(errors='replace')
+        try:
+            _check_returncode(proc.returncode, cmd, stdout, stderr, cpu_limit, memory_limit)
+        except subprocess.CalledProcessError:
+            print(f"✗ Error vectorizing {input_path.name}:")
+            print(f"  {stderr}")
+            raise
+        
+        os.replace(partial, output_path)
+        if cache is not None:
+            await asyncio.to_thread(cache.store, key, output_path)
+        if metrics is not None:
+            metrics['output_bytes'] = output_path.stat().st_size
+        print(f"✓ Successfully created: {output_path}")
+        return output_path
+    finally:
+        try:
+            os.remove(partial)
+        except FileNotFoundError:
+            pass
 
 def select_files_gui():
     """Open file dialog to select images"""
+    # Tk is imported here so headless runs never pay for it
+    import tkinter as tk
+    from tkinter import filedialog
+    
     root = tk.Tk()
     root.withdraw()  # Hide main window
     
@@ -98,25 +1339,1099 @@ def select_files_gui():
     root.destroy()
     return files
 
-def get_next_svg_filename(output_dir):
-    svg_files = list(output_dir.glob('*.svg'))
-    numbers = []
-    for f in svg_files:
+class OutputAllocator:
+    """
+    Hands out sequentially numbered output files (1.svg, 2.svg, ...).
+    The directory is scanned once; after that each name costs O(1). Names are
+    reserved with an exclusive create, so threads and other processes writing
+    to the same directory never get the same file.
+    """
+    def __init__(self, output_dir, suffix='.svg'):
+        self.output_dir = Path(output_dir)
+        self.suffix = suffix
+        self._next = None
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        highest = 0
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                # .svg and .svgz outputs share one sequence
+                if ext not in (self.suffix, '.svg', '.svgz'):
+                    continue
+                try:
+                    highest = max(highest, int(stem))
+                except ValueError:
+                    continue
+        return highest + 1
+
+    def reserve(self):
+        """Create and return the next free numbered output file"""
+        with self._lock:
+            if self._next is None:
+                self._next = self._scan()
+            while True:
+                path = self.output_dir / f"{self._next}{self.suffix}"
+                self._next += 1
+                try:
+                    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                    return path
+                except FileExistsError:
+                    # Taken by another process since our scan, try the next one
+                    continue
+
+def release_output(output_path):
+    """
+    Give back an output name after a failed conversion. Only the empty
+    placeholder left by OutputAllocator.reserve() is removed: conversions
+    replace their output only on success, so a file with content is an
+    earlier result (such as a re-traced manifest entry) and is kept.
+    """
+    try:
+        if os.path.getsize(output_path) == 0:
+            os.remove(output_path)
+    except FileNotFoundError:
+        pass
+
+class Manifest:
+    """
+    Make-style record of earlier conversions: input path -> (content hash,
+    output settings, output path). Inputs whose size and mtime are unchanged
+    are skipped without reading them; touched files are re-hashed and only
+    traced again if their content or the settings (see output_settings())
+    actually changed.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.skipped = 0
+        self._pending = {}
         try:
-            n = int(f.stem)
-            numbers.append(n)
-        except ValueError:
+            with open(self.path) as f:
+                self.entries = json.load(f)['entries']
+        except FileNotFoundError:
+            self.entries = {}
+
+    def plan(self, files, output_dir, params, suffix='.svg'):
+        """
+        Yield (input, output) pairs for files that need tracing. Changed
+        inputs keep their previous output name; new ones get a fresh number.
+        """
+        params = canonical_params(params)
+        allocator = OutputAllocator(output_dir, suffix)
+        output_dir = os.path.abspath(output_dir)
+        for f in files:
+            input_path = Path(f)
+            key = os.path.abspath(input_path)
+            entry = self.entries.get(key)
+            if entry and (os.path.dirname(entry['output']) != output_dir
+                          or not entry['output'].endswith(suffix)):
+                entry = None  # traced into another directory or format; start fresh here
+            try:
+                st = os.stat(input_path)
+            except FileNotFoundError:
+                # Let the conversion report the missing file
+                yield input_path, allocator.reserve()
+                continue
+            stamp = [st.st_size, st.st_mtime_ns]
+            digest = None
+            if entry and entry['params'] == params and os.path.exists(entry['output']):
+                if entry['stamp'] == stamp:
+                    self.skipped += 1
+                    continue
+                digest = file_digest(input_path)
+                if entry['digest'] == digest:
+                    entry['stamp'] = stamp
+                    self.skipped += 1
+                    continue
+            if digest is None:
+                digest = file_digest(input_path)
+            output_path = Path(entry['output']) if entry else allocator.reserve()
+            self._pending[key] = {'digest': digest, 'stamp': stamp, 'params': params}
+            yield input_path, output_path
+
+    def record(self, input_path, output_path):
+        """Mark a planned input as successfully traced to output_path"""
+        key = os.path.abspath(input_path)
+        if key in self._pending:
+            self.entries[key] = {**self._pending.pop(key), 'output': os.path.abspath(output_path)}
+
+    def save(self):
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({'version': 1, 'entries': self.entries}, f)
+        os.replace(tmp, self.path)
+
+def output_suffix(vparams):
+    """File extension for outputs written with these vectorize_image() options"""
+    return '.svgz' if vparams.get('compress_level') is not None else '.svg'
+
+def plan_outputs(files, output_dir, suffix='.svg'):
+    """Reserve sequential output names for files in input order, as they are consumed"""
+    allocator = OutputAllocator(output_dir, suffix)
+    for f in files:
+        yield Path(f), allocator.reserve()
+
+def is_image_file(name):
+    """True for names with an image suffix that aren't hidden files"""
+    return os.path.splitext(name)[1].lower() in IMAGE_SUFFIXES and not name.startswith('.')
+
+def _matches_any(name, relative, patterns):
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(relative, p) for p in patterns)
+
+def iter_image_files(paths, recursive=False, include=None, exclude=None):
+    """
+    Yield input files from a mix of file and directory paths, reading each
+    directory only when the previous ones are used up, so a huge tree can
+    feed a batch before it has been fully listed. Files named directly are
+    always yielded. Directories contribute their images (and with recursive,
+    those below them) that match an include pattern, if any are given, and
+    no exclude pattern. Patterns are globs tested against the file name and
+    the path relative to the directory argument; excluded subdirectories are
+    not entered. Entries come in the order the filesystem lists them, which
+    is not sorted: sorting would mean reading a whole directory before
+    yielding anything, and a flat directory can hold millions of files.
+    """
+    include = include or []
+    exclude = exclude or []
+    for path in paths:
+        if not os.path.isdir(path):
+            yield Path(path)
             continue
-    next_num = max(numbers, default=0) + 1
-    return output_dir / f"{next_num}.svg"
+        root = os.path.join(str(path), '')
+        stack = [str(path)]
+        while stack:
+            directory = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        relative = entry.path[len(root):]
+                        try:
+                            # Symlinked directories are not followed, which rules out cycles
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive and not _matches_any(entry.name, relative, exclude):
+                                    subdirs.append(entry.path)
+                                continue
+                        except OSError:
+                            continue
+                        if not is_image_file(entry.name):
+                            continue
+                        if include and not _matches_any(entry.name, relative, include):
+                            continue
+                        if not _matches_any(entry.name, relative, exclude):
+                            yield Path(entry.path)
+            except OSError as e:
+                print(f"✗ Cannot read directory {directory}: {e}")
+            # Depth first
+            stack.extend(reversed(subdirs))
+
+class Journal:
+    """
+    Append-only JSON-lines log of batch progress. The first record describes
+    the batch (output directory, parameters and, for a streamed directory
+    batch, the directories it lists); each job then gets queued, started and
+    done/failed records, with absolute paths. Every record is flushed as it
+    is written, so a killed process loses nothing. fsync is batched but never
+    more than sync_interval behind, so a power failure loses at most that
+    last moment of progress, never earlier records.
+    """
+    def __init__(self, path, sync_every=64, sync_interval=1.0):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        line = json.dumps({'event': event, **fields}) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.sync_every
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync()
+            elif self._timer is None:
+                # Quiet stretches (one slow job) must not leave records unsynced
+                self._timer = threading.Timer(self.sync_interval, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _sync(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    @staticmethod
+    def load(path):
+        """
+        Read a journal in one pass and return (batch record, jobs), where jobs
+        maps each output path to {'input': ..., 'state': ...} in queue order.
+        """
+        batch = None
+        jobs = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn final write from a crash
+                event = record.pop('event')
+                if event == 'batch':
+                    batch = record
+                elif event == 'queued':
+                    jobs[record['output']] = {'input': record['input'], 'state': 'queued'}
+                elif record.get('output') in jobs:
+                    jobs[record['output']]['state'] = event
+        if batch is None:
+            raise ValueError(f"Not a batch journal: {path}")
+        return batch, jobs
+
+def _timed_job(input_path, output_path, submitted, vparams, on_metrics, journal=None, gate=None):
+    """Run one batch job, recording its metrics and handing them to on_metrics"""
+    with (gate or nullcontext()):
+        _run_timed_job(input_path, output_path, submitted, vparams, on_metrics, journal)
+
+def _run_timed_job(input_path, output_path, submitted, vparams, on_metrics, journal):
+    if journal is not None:
+        journal.write('started', output=os.path.abspath(output_path))
+    started = time.perf_counter()
+    metrics = {
+        'input': str(input_path),
+        'output': str(output_path),
+        'status': 'failed',
+        'queue_wait': started - submitted,
+    }
+    try:
+        vectorize_image(input_path, output_path, metrics=metrics, **vparams)
+        metrics['status'] = 'cached' if metrics.pop('cached', False) else 'ok'
+    except ConversionTimeout:
+        metrics['status'] = 'timeout'
+        raise
+    except ResourceLimitExceeded:
+        metrics['status'] = 'limited'
+        raise
+    finally:
+        metrics['total'] = time.perf_counter() - started
+        if on_metrics is not None:
+            on_metrics(metrics)
+
+class TimingHistory:
+    """
+    Wall times of earlier conversions per input file and parameter set,
+    kept in the cache directory so later batches can be ordered by how long
+    their images actually took rather than by size alone.
+    """
+    def __init__(self, path=None):
+        self.path = Path(path) if path else default_cache_dir() / 'timings.json'
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def _stamp(input_path):
+        st = os.stat(input_path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def expected(self, input_path, params):
+        """Seconds the last conversion of this exact file took, or None"""
+        entry = self.entries.get(os.path.abspath(input_path))
+        try:
+            if entry and entry['params'] == canonical_params(params) \
+                    and entry['stamp'] == self._stamp(input_path):
+                return entry['seconds']
+        except OSError:
+            pass
+        return None
+
+    def seconds_per_pixel(self, params):
+        """Average cost per pixel across recorded runs with these parameters"""
+        params = canonical_params(params)
+        runs = [e for e in self.entries.values() if e['params'] == params and e.get('pixels')]
+        pixels = sum(e['pixels'] for e in runs)
+        return sum(e['seconds'] for e in runs) / pixels if pixels else None
+
+    def record(self, metrics, params):
+        """Remember the time of a finished job from its metrics dict"""
+        if metrics['status'] != 'ok':
+            return  # cache hits and failures say nothing about tracing time
+        input_path = metrics['input']
+        try:
+            stamp = self._stamp(input_path)
+            size = read_image_size(input_path)
+        except OSError:
+            return
+        with self._lock:
+            self.entries[os.path.abspath(input_path)] = {
+                'stamp': stamp,
+                'params': canonical_params(params),
+                'seconds': metrics['total'],
+                'pixels': size[0] * size[1] if size else None,
+            }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with self._lock:
+            with open(tmp, 'w') as f:
+                json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+def estimate_cost(input_path):
+    """Expected tracing work for an image: its pixel count, else its file size"""
+    try:
+        size = read_image_size(input_path)
+    except Exception:
+        size = None  # scheduling is only a hint; the job reports the real error
+    try:
+        return size[0] * size[1] if size else os.path.getsize(input_path)
+    except OSError:
+        return 0  # missing or unreadable; it will fail fast
+
+def schedule_tasks(tasks, params=None, history=None):
+    """
+    Order (input, output) pairs longest-expected first, so one huge image at
+    the end of the list doesn't leave a single worker running long after the
+    rest are idle. With a TimingHistory, inputs traced before use their
+    recorded time and the rest are scaled by the observed seconds per pixel.
+    """
+    costs = {input_path: estimate_cost(input_path) for input_path, _ in tasks}
+    rate = history.seconds_per_pixel(params) if history is not None else None
+    if rate:
+        for input_path in costs:
+            seconds = history.expected(input_path, params)
+            costs[input_path] = seconds if seconds is not None else costs[input_path] * rate
+    # sorted() is stable, so equal costs keep their input order
+    return sorted(tasks, key=lambda task: costs[task[0]], reverse=True)
+
+def _read_meminfo():
+    """MemAvailable in bytes from /proc/meminfo, or None where unavailable"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _read_memory_pressure():
+    """10-second 'some' memory stall percentage from PSI, or None"""
+    try:
+        with open('/proc/pressure/memory') as f:
+            for line in f:
+                if line.startswith('some'):
+                    return float(line.split('avg10=')[1].split()[0])
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+class AdaptiveConcurrency:
+    """
+    Gate that lets between min_jobs and max_jobs conversions run at once and
+    retunes that number while a batch runs. It backs off when the load
+    average exceeds the CPU count or PSI reports memory stalls, never allows
+    more jobs than available memory fits at the observed per-job peak RSS,
+    and otherwise adds jobs while CPUs are idle. Every change is logged.
+    Use it as a context manager around each job and feed it job metrics.
+    """
+    def __init__(self, min_jobs=1, max_jobs=None, interval=2.0, log=print):
+        self.cpus = os.cpu_count() or 1
+        self.max_jobs = max_jobs or self.cpus
+        self.min_jobs = max(1, min(min_jobs, self.max_jobs))
+        self.limit = max(self.min_jobs, min(self.max_jobs, self.cpus))
+        self.interval = interval
+        self.log = log
+        self.active = 0
+        self.job_rss = None
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def observe(self, metrics):
+        """Track per-job peak RSS (moving average) from a job's metrics"""
+        rss = metrics.get('max_rss')
+        if rss:
+            with self._cond:
+                self.job_rss = rss if self.job_rss is None else 0.7 * self.job_rss + 0.3 * rss
+
+    def decide(self):
+        """Pick a new limit from current load and memory readings"""
+        try:
+            load = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            load = None
+        available = _read_meminfo()
+        pressure = _read_memory_pressure()
+        
+        with self._cond:
+            target = self.limit
+            if pressure is not None and pressure > 10:
+                target -= 1
+            elif load is not None and load > self.cpus * 1.1:
+                target -= 1
+            elif load is None or load < self.cpus * 0.8:
+                target += 1
+            if available is not None and self.job_rss:
+                # Running jobs are already inside used memory; new ones need headroom
+                fits = self.active + int(available * 0.8 // self.job_rss)
+                target = min(target, fits)
+            target = max(self.min_jobs, min(self.max_jobs, target))
+            if target == self.limit:
+                return target
+            previous, self.limit = self.limit, target
+            self._cond.notify_all()
+        
+        readings = []
+        if load is not None:
+            readings.append(f"load {load:.2f}/{self.cpus} CPUs")
+        if available is not None:
+            readings.append(f"{available // (1024 * 1024)} MB available")
+        if pressure is not None:
+            readings.append(f"memory pressure {pressure:.1f}%")
+        if self.job_rss:
+            readings.append(f"~{int(self.job_rss) // (1024 * 1024)} MB per job")
+        self.log(f"⚙ Concurrency {previous} -> {target} ({', '.join(readings)})")
+        return target
+
+    def start(self):
+        def loop():
+            while not self._stop.wait(self.interval):
+                self.decide()
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+def _journal_queued(tasks, journal):
+    """Pass (input, output) pairs through, logging each as queued as it is taken"""
+    for input_path, output_path in tasks:
+        journal.write('queued', input=os.path.abspath(input_path), output=os.path.abspath(output_path))
+        yield input_path, output_path
+
+def run_batch(files, output_dir, jobs=None, on_metrics=None, manifest=None, journal=None,
+              tasks=None, adaptive=None, schedule='largest', history=None, sources=None, **vparams):
+    """
+    Vectorize files concurrently with up to `jobs` vtracer processes.
+    Output names are assigned up front, so they follow input order no matter
+    which job finishes first. Returns (successful, failed).
+    on_metrics, if given, is called from the worker thread with a metrics dict
+    for every job (see vectorize_image() and run_vtracer() for the fields).
+    With a Manifest, up-to-date inputs are skipped and counted in manifest.skipped.
+    With a Journal, every job's progress is logged so the batch can be resumed.
+    `tasks` takes already planned (input, output) pairs, which run before
+    any `files` (a resumed batch passes both).
+    `files` may be a lazy iterable such as iter_image_files(): only a few
+    jobs per worker are queued at a time, so conversions start while it is
+    still being read. `sources` gives the iter_image_files() arguments it
+    came from; they go in the journal so a resume can list the images this
+    run never reached.
+    With an AdaptiveConcurrency, it decides how many of the `jobs` workers
+    may run a conversion at any moment.
+    schedule='largest' starts the most expensive images first (see
+    schedule_tasks()), which means reading all of a lazy `files` first;
+    'input' keeps the given order. A TimingHistory both
+    refines that estimate and records this batch's times.
+    With tile_size and no tile_jobs, the CPUs are split between the images
+    running at once.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    settings = output_settings(vparams)
+    if adaptive is not None or history is not None:
+        user_on_metrics = on_metrics
+        def on_metrics(metrics):
+            if adaptive is not None:
+                adaptive.observe(metrics)
+            if history is not None:
+                history.record(metrics, settings)
+            if user_on_metrics is not None:
+                user_on_metrics(metrics)
+    planned = [(Path(i), Path(o)) for i, o in tasks] if tasks is not None else []
+    if files is not None:
+        for _, output_path in planned:
+            # Hold their names (their placeholders may be gone), so new files are numbered after them
+            open(output_path, 'a').close()
+    if files is None:
+        new = []
+    elif manifest is not None:
+        new = manifest.plan(files, output_dir, settings, output_suffix(vparams))
+    else:
+        new = plan_outputs(files, output_dir, output_suffix(vparams))
+    largest_first = schedule == 'largest' and jobs > 1
+    streaming = files is not None and not isinstance(files, (list, tuple)) and not largest_first
+    if journal is not None:
+        if tasks is None:
+            # Every option, not just the output settings, so a resume runs the same way
+            options = {k: v for k, v in vparams.items() if k not in ('cache', 'control')}
+            journal.write('batch', output_dir=os.path.abspath(output_dir), params=settings,
+                          options=options, sources=sources if streaming else None)
+        new = _journal_queued(new, journal)
+        if not streaming:
+            # Log the whole plan before starting, so a resume can finish all of it
+            new = list(new)
+            journal.sync()
+    tasks = itertools.chain(planned, new)
+    if largest_first:
+        tasks = schedule_tasks(list(tasks), settings, history)
+    elif not streaming:
+        tasks = list(tasks)
+    if vparams.get('tile_size') and not vparams.get('tile_jobs'):
+        # Share the CPUs out between the images that can actually be tiling at
+        # once: a single huge scan gets them all, a full pool one tile each
+        running = jobs if streaming else max(1, min(jobs, len(tasks)))
+        vparams = dict(vparams, tile_jobs=max(1, (os.cpu_count() or 1) // running))
+    if adaptive is not None:
+        adaptive.start()
+    successful = 0
+    failed = 0
+    # Output names reserved but not converted yet, handed back if the batch is interrupted
+    unfinished = set() if streaming else {output_path for _, output_path in tasks}
+    try:
+        # vtracer does the work in a child process, so threads are enough here
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            try:
+                tasks = iter(tasks)
+                futures = {}
+                while True:
+                    # Top the queue up to a couple of jobs per worker
+                    for input_path, output_path in itertools.islice(tasks, 2 * jobs - len(futures)):
+                        unfinished.add(output_path)
+                        # queue_wait counts from here, not from the start of the batch
+                        future = pool.submit(_timed_job, input_path, output_path, time.perf_counter(),
+                                             vparams, on_metrics, journal, adaptive)
+                        futures[future] = (input_path, output_path)
+                    if not futures:
+                        break
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        input_path, output_path = futures.pop(future)
+                        unfinished.discard(output_path)
+                        try:
+                            future.result()
+                            successful += 1
+                            if manifest is not None:
+                                manifest.record(input_path, output_path)
+                            if journal is not None:
+                                journal.write('done', output=os.path.abspath(output_path))
+                        except Exception as e:
+                            print(f"✗ Failed to process {input_path}: {e}")
+                            release_output(output_path)
+                            failed += 1
+                            if journal is not None:
+                                journal.write('failed', output=os.path.abspath(output_path), error=str(e))
+            except BaseException:
+                # Drop the queued jobs; the running ones finish or die with their VTracer
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        if adaptive is not None:
+            adaptive.stop()
+        if history is not None:
+            history.save()
+        if manifest is not None:
+            manifest.save()
+        if journal is not None:
+            journal.sync()
+        elif unfinished:
+            # Interrupted: empty placeholders would look like outputs and push later
+            # numbering past them. With a journal they are kept for --resume.
+            for output_path in unfinished:
+                release_output(output_path)
+    return successful, failed
+
+async def run_batch_async(files, output_dir, jobs=None, on_metrics=None, schedule='largest',
+                          **vparams):
+    """
+    Event-loop version of run_batch(): at most `jobs` vtracer children run at
+    once, driven from a single thread. Returns (successful, failed).
+    Takes the options vectorize_image_async() does.
+    """
+    import asyncio
+    # Refuse unsupported options before any job starts rather than failing each one
+    extra = {k: vparams.pop(k, None) for k in ('cache', 'timeout', 'cpu_limit', 'memory_limit')}
+    vparams = dict(_async_params(vparams), **extra)
+    semaphore = asyncio.Semaphore(jobs or os.cpu_count() or 1)
+    tasks = list(plan_outputs(files, output_dir))
+    if schedule == 'largest':
+        # The semaphore wakes waiters in FIFO order, so creation order is run order
+        tasks = schedule_tasks(tasks)
+    submitted = time.perf_counter()
+    
+    async def job(input_path, output_path):
+        metrics = {'input': str(input_path), 'output': str(output_path), 'status': 'failed'}
+        async with semaphore:
+            started = time.perf_counter()
+            metrics['queue_wait'] = started - submitted
+            try:
+                await vectorize_image_async(input_path, output_path, metrics=metrics, **vparams)
+                metrics['status'] = 'cached' if metrics.pop('cached', False) else 'ok'
+            except ConversionTimeout:
+                metrics['status'] = 'timeout'
+                raise
+            except ResourceLimitExceeded:
+                metrics['status'] = 'limited'
+                raise
+            finally:
+                metrics['total'] = time.perf_counter() - started
+                if on_metrics is not None:
+                    on_metrics(metrics)
+    
+    results = await asyncio.gather(
+        *(job(input_path, output_path) for input_path, output_path in tasks),
+        return_exceptions=True
+    )
+    failed = 0
+    for (input_path, output_path), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"✗ Failed to process {input_path}: {result}")
+            release_output(output_path)
+            failed += 1
+    return len(tasks) - failed, failed
+
+class InotifyWatcher:
+    """Reports files in a directory as they are closed after writing or moved in (Linux)"""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(self.directory),
+                                    self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {self.directory}')
+
+    def poll(self, timeout):
+        """
+        Wait up to timeout seconds and return the paths that changed. If the
+        kernel queue overflowed, events were lost, so every file is returned.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        paths = []
+        overflowed = False
+        # Drain the queue, so a burst is not left to overflow it
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflowed = True
+                elif name:
+                    paths.append(self.directory / os.fsdecode(name))
+        if overflowed:
+            with os.scandir(self.directory) as entries:
+                return [Path(entry.path) for entry in entries if entry.is_file()]
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Portable fallback that rescans the directory for new or changed files"""
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.seen = {}
+
+    def poll(self, timeout):
+        time.sleep(timeout)
+        current = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    current[entry.path] = (st.st_size, st.st_mtime_ns)
+        changed = [Path(p) for p, sig in current.items() if self.seen.get(p) != sig]
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+def make_watcher(directory):
+    """inotify where the OS supports it, polling everywhere else"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(directory)
+
+def watch_and_vectorize(watch_dir, output_dir, jobs=None, settle=1.0, poll_interval=1.0,
+                        on_metrics=None, **vparams):
+    """
+    Vectorize images as they land in watch_dir until interrupted.
+    A file is traced once its size and mtime have been stable for `settle`
+    seconds, and again if it is later rewritten. Files already present at
+    startup are picked up too. Returns (successful, failed) on Ctrl+C.
+    """
+    watch_dir = Path(watch_dir)
+    jobs = jobs or os.cpu_count() or 1
+    watcher = make_watcher(watch_dir)
+    # inotify wakes us on events, so only the stability checks set the pace
+    tick = min(settle / 2, 0.25) if isinstance(watcher, InotifyWatcher) else poll_interval
+    allocator = OutputAllocator(output_dir, output_suffix(vparams))
+    pending = {}    # path -> (size, mtime) signature, time it last changed
+    submitted = {}  # path -> signature that was last traced
+    counts = {'successful': 0, 'failed': 0}
+    lock = threading.Lock()
+    
+    def finished(future, input_path, output_path):
+        try:
+            future.result()
+            key = 'successful'
+        except Exception as e:
+            print(f"✗ Failed to process {input_path}: {e}")
+            release_output(output_path)
+            key = 'failed'
+        with lock:
+            counts[key] += 1
+    
+    now = time.monotonic()
+    for path in sorted(watch_dir.iterdir()):
+        if is_image_file(path.name):
+            pending[path] = (None, now)
+    
+    print(f"Watching {watch_dir} ({type(watcher).__name__}), press Ctrl+C to stop")
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while True:
+                now = time.monotonic()
+                for path in watcher.poll(tick):
+                    if is_image_file(path.name):
+                        pending.setdefault(path, (None, now))
+                now = time.monotonic()
+                for path, (sig, since) in list(pending.items()):
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        del pending[path]
+                        submitted.pop(path, None)
+                        continue
+                    current = (st.st_size, st.st_mtime_ns)
+                    if current != sig:
+                        pending[path] = (current, now)
+                        continue
+                    if now - since < settle:
+                        continue
+                    del pending[path]
+                    if submitted.get(path) == current:
+                        continue
+                    submitted[path] = current
+                    output_path = allocator.reserve()
+                    future = pool.submit(_timed_job, path, output_path, time.perf_counter(),
+                                         vparams, on_metrics)
+                    future.add_done_callback(
+                        lambda f, i=path, o=output_path: finished(f, i, o))
+    except KeyboardInterrupt:
+        print("\nStopping watch, waiting for running conversions...")
+    finally:
+        watcher.close()
+    return counts['successful'], counts['failed']
+
+def write_metrics_json(path, jobs_metrics, wall_seconds):
+    """Write per-job metrics plus batch totals to a JSON file"""
+    def total(field):
+        return sum(m.get(field, 0) for m in jobs_metrics)
+    report = {
+        'wall_seconds': wall_seconds,
+        'totals': {
+            'jobs': len(jobs_metrics),
+            'ok': sum(1 for m in jobs_metrics if m['status'] == 'ok'),
+            'cached': sum(1 for m in jobs_metrics if m['status'] == 'cached'),
+            # Every job that produced nothing, as in the CLI summary; timeouts
+            # and resource-limit kills are also broken out
+            'failed': sum(1 for m in jobs_metrics if m['status'] not in ('ok', 'cached')),
+            'timeout': sum(1 for m in jobs_metrics if m['status'] == 'timeout'),
+            'limited': sum(1 for m in jobs_metrics if m['status'] == 'limited'),
+            'child_wall': total('child_wall'),
+            'child_user': total('child_user'),
+            'child_sys': total('child_sys'),
+            'max_rss': max((m.get('max_rss', 0) for m in jobs_metrics), default=0),
+            'output_bytes': total('output_bytes'),
+        },
+        'jobs': jobs_metrics,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def _cubic_points(p0, p1, p2, p3, steps):
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        yield (u**3 * p0[0] + 3 * u*u*t * p1[0] + 3 * u*t*t * p2[0] + t**3 * p3[0],
+               u**3 * p0[1] + 3 * u*u*t * p1[1] + 3 * u*t*t * p2[1] + t**3 * p3[1])
+
+def _flatten_path(segments, steps=8):
+    """Polygons, one per subpath, with curves split into `steps` straight pieces"""
+    polygons = []
+    points = []
+    x = y = start_x = start_y = 0.0
+    cubic = quad = None  # last control points, for S/T reflection
+    for cmd, args in segments:
+        if cmd in ('M', 'Z'):
+            if len(points) > 2:
+                polygons.append(points)
+            if cmd == 'M':
+                start_x, start_y = args
+            x, y = start_x, start_y
+            points = [(x, y)]
+            cubic = quad = None
+            continue
+        if not points:
+            points = [(x, y)]
+        if cmd == 'H':
+            cmd, args = 'L', [args[0], y]
+        elif cmd == 'V':
+            cmd, args = 'L', [x, args[0]]
+        if cmd in ('C', 'S'):
+            if cmd == 'S':
+                c1 = (2 * x - cubic[0], 2 * y - cubic[1]) if cubic else (x, y)
+                args = [*c1, *args]
+            c1, c2, end = (args[0], args[1]), (args[2], args[3]), (args[4], args[5])
+            points.extend(_cubic_points((x, y), c1, c2, end, steps))
+            cubic, quad = c2, None
+        elif cmd in ('Q', 'T'):
+            if cmd == 'T':
+                q = (2 * x - quad[0], 2 * y - quad[1]) if quad else (x, y)
+                args = [*q, *args]
+            q, end = (args[0], args[1]), (args[2], args[3])
+            # A quadratic is a cubic with controls 2/3 of the way to q
+            c1 = (x + 2 / 3 * (q[0] - x), y + 2 / 3 * (q[1] - y))
+            c2 = (end[0] + 2 / 3 * (q[0] - end[0]), end[1] + 2 / 3 * (q[1] - end[1]))
+            points.extend(_cubic_points((x, y), c1, c2, end, steps))
+            cubic, quad = None, q
+        else:
+            # L, and A approximated by its chord; VTracer does not emit arcs
+            end = (args[-2], args[-1])
+            points.append(end)
+            cubic = quad = None
+        x, y = end
+    if len(points) > 2:
+        polygons.append(points)
+    return polygons
+
+def rasterize_svg(svg_path, size=None):
+    """
+    Render an SVG made of filled paths, like VTracer's output, to a Pillow
+    image. Holes are drawn even-odd; strokes, gradients and clipping are
+    ignored, so this is for previews rather than a general renderer.
+    """
+    Image = require_pillow('SVG preview')
+    from PIL import ImageChops, ImageColor, ImageDraw
+    image = draw = None
+    scale = (1.0, 1.0)
+    offsets = [(0.0, 0.0)]
+    for event, el in ET.iterparse(svg_path, events=('start', 'end')):
+        tag = el.tag.rsplit('}', 1)[-1]
+        if event == 'start':
+            if tag == 'svg' and image is None:
+                width = float(re.match(r'[\d.]+', el.get('width', '0')).group(0) or 0)
+                height = float(re.match(r'[\d.]+', el.get('height', '0')).group(0) or 0)
+                view = [float(v) for v in re.split(r'[\s,]+', el.get('viewBox', '').strip()) if v]
+                if len(view) == 4:
+                    width, height = width or view[2], height or view[3]
+                else:
+                    view = [0, 0, width, height]
+                size = size or (round(width), round(height))
+                scale = (size[0] / view[2], size[1] / view[3])
+                offsets = [(-view[0], -view[1])]
+                image = Image.new('RGB', size, 'white')
+                draw = ImageDraw.Draw(image)
+            elif tag in ('g', 'path'):
+                match = _TRANSLATE.match(el.get('transform', ''))
+                dx, dy = (float(match.group(1)), float(match.group(2) or 0)) if match else (0.0, 0.0)
+                offsets.append((offsets[-1][0] + dx, offsets[-1][1] + dy))
+            continue
+        if tag == 'path' and image is not None and el.get('d'):
+            fill = el.get('fill', 'black')
+            if fill != 'none':
+                try:
+                    color = ImageColor.getrgb(fill)
+                except ValueError:
+                    color = (0, 0, 0)
+                ox, oy = offsets[-1]
+                polygons = [[((px + ox) * scale[0], (py + oy) * scale[1]) for px, py in poly]
+                            for poly in _flatten_path(_parse_path(el.get('d')))]
+                if len(polygons) == 1:
+                    draw.polygon(polygons[0], fill=color)
+                elif polygons:
+                    mask = Image.new('1', image.size)
+                    for poly in polygons:
+                        piece = Image.new('1', image.size)
+                        ImageDraw.Draw(piece).polygon(poly, fill=1)
+                        mask = ImageChops.logical_xor(mask, piece)
+                    image.paste(color, mask=mask)
+        if tag in ('g', 'path'):
+            offsets.pop()
+        el.clear()
+    if image is None:
+        raise ValueError(f"No <svg> element in {svg_path}")
+    return image
+
+def render_preview(input_path, params, max_dimension=PREVIEW_SIZE, control=None):
+    """
+    Trace a copy of an image shrunk to max_dimension and rasterize the
+    result, returning a Pillow image. A BatchControl cancels the trace.
+    """
+    Image = require_pillow('Preview')
+    with tempfile.TemporaryDirectory() as tmp:
+        small = Path(tmp) / 'preview.png'
+        with Image.open(input_path) as im:
+            if im.mode not in ('1', 'L', 'LA', 'RGB', 'RGBA'):
+                im = im.convert('RGBA')
+            im.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            im.save(small)
+            size = im.size
+        cmd = build_vtracer_command(small, small.with_suffix('.svg'), **params)
+        run_vtracer(cmd, control=control)
+        return rasterize_svg(small.with_suffix('.svg'), size)
+
+class PreviewCache:
+    """In-memory LRU of rendered previews keyed by image file and parameters"""
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def key(self, input_path, params):
+        st = os.stat(input_path)
+        return (os.path.abspath(input_path), st.st_size, st.st_mtime_ns, canonical_params(params))
+
+    def get(self, key):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._entries[key] = value  # most recently used last
+        return value
+
+    def put(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+def format_duration(seconds):
+    """Short human form of a duration, e.g. '1h 02m', '3m 05s', '12s'"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class ProgressTracker:
+    """
+    Batch progress and throughput. Workers call job_done() for each file;
+    the display calls snapshot() at its own pace. The ETA scales the pixels
+    still to do by a moving average of seconds per pixel over completed
+    jobs, so a few huge images left at the end are not mistaken for quick ones.
+    """
+    def __init__(self, pixels, workers=1, smoothing=0.2):
+        self.total = len(pixels)
+        self.total_pixels = sum(pixels)
+        self.workers = workers
+        self.smoothing = smoothing
+        self.done = 0
+        self.done_pixels = 0
+        self.seconds_per_pixel = None
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def job_done(self, pixels, seconds, ok=True):
+        with self._lock:
+            self.done += 1
+            self.done_pixels += pixels
+            if ok and pixels:
+                # Failures usually end early and would make the rest look cheap
+                rate = seconds / pixels
+                if self.seconds_per_pixel is None:
+                    self.seconds_per_pixel = rate
+                else:
+                    self.seconds_per_pixel += self.smoothing * (rate - self.seconds_per_pixel)
+
+    def snapshot(self):
+        """Dict with done, total, fraction, images_per_sec, mp_per_sec and eta (seconds or None)"""
+        with self._lock:
+            elapsed = max(time.perf_counter() - self.started, 1e-9)
+            eta = None
+            if self.seconds_per_pixel is not None:
+                remaining = self.total_pixels - self.done_pixels
+                eta = max(0, remaining) * self.seconds_per_pixel / self.workers
+            return {
+                'done': self.done,
+                'total': self.total,
+                'fraction': self.done / self.total if self.total else 1.0,
+                'images_per_sec': self.done / elapsed,
+                'mp_per_sec': self.done_pixels / elapsed / 1e6,
+                'eta': eta,
+            }
 
 def run_gui():
-    import threading
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
     root = tk.Tk()
     root.title("VTracer Image Vectorizer")
-    root.geometry("500x600")
+    root.geometry("800x650")
     script_dir = Path(os.path.abspath(os.path.dirname(__file__)))
 
+    # Preview pane on the right; everything else stacks down the left
+    preview_frame = tk.LabelFrame(root, text="Preview")
+    preview_frame.pack(side='right', fill='both', expand=True, padx=(0, 10), pady=10)
+    preview_label = tk.Label(preview_frame, text="Select an image to preview", wraplength=260)
+    preview_label.pack(expand=True)
+
     # File selection
     files_var = tk.StringVar()
     def select_files():
@@ -128,11 +2443,13 @@ def run_gui():
         files_list.delete(0, tk.END)
         for f in files:
             files_list.insert(tk.END, f)
+        schedule_preview()
 
     tk.Label(root, text="Input Images:").pack(anchor='w', padx=10, pady=(10,0))
     tk.Button(root, text="Select Images", command=select_files).pack(anchor='w', padx=10)
-    files_list = tk.Listbox(root, height=4, width=60)
+    files_list = tk.Listbox(root, height=4, width=60, exportselection=False)
     files_list.pack(padx=10, pady=(0,10))
+    files_list.bind('<<ListboxSelect>>', lambda event: schedule_preview())
 
     # Output directory
     output_dir_var = tk.StringVar()
@@ -188,16 +2505,178 @@ def run_gui():
     tk.Label(param_frame, text="Splice Threshold:").grid(row=row, column=0, sticky='w')
     tk.Entry(param_frame, textvariable=params['splice_threshold'], width=8).grid(row=row, column=1, sticky='w')
 
-    # Status area
+    # Status area. Worker threads never touch Tk: they queue events, and the
+    # main loop drains them in batches so thousands of lines cost a few repaints.
     status_text = tk.Text(root, height=10, width=60, state='disabled')
     status_text.pack(padx=10, pady=10)
+    events = queue.SimpleQueue()
     def log(msg):
-        status_text.config(state='normal')
-        status_text.insert(tk.END, msg + '\n')
-        status_text.see(tk.END)
-        status_text.config(state='disabled')
+        events.put(('log', msg))
+
+    # Progress, redrawn at a fixed rate from the running batch's tracker
+    progress_bar = ttk.Progressbar(root, orient='horizontal', length=460, mode='determinate', maximum=1.0)
+    progress_bar.pack(padx=10)
+    progress_var = tk.StringVar(value="Idle")
+    tk.Label(root, textvariable=progress_var, anchor='w').pack(fill='x', padx=10)
+    tracker = None
+
+    def draw_progress():
+        if tracker is not None:
+            snap = tracker.snapshot()
+            progress_bar['value'] = snap['fraction']
+            eta = format_duration(snap['eta']) if snap['eta'] is not None else '--'
+            progress_var.set(
+                f"{snap['done']}/{snap['total']} images  ·  {snap['images_per_sec']:.2f} img/s  ·  "
+                f"{snap['mp_per_sec']:.2f} MP/s  ·  ETA {eta}"
+            )
+        root.after(GUI_PROGRESS_MS, draw_progress)
+    root.after(GUI_PROGRESS_MS, draw_progress)
+
+    def drain_events():
+        nonlocal tracker
+        lines = []
+        try:
+            while len(lines) < GUI_DRAIN_BATCH:
+                kind, payload = events.get_nowait()
+                if kind == 'log':
+                    lines.append(payload)
+                elif kind == 'batch':
+                    tracker = payload
+                elif kind == 'finished':
+                    batch_finished()
+                elif kind == 'preview':
+                    show_preview(*payload)
+        except queue.Empty:
+            pass
+        if lines:
+            status_text.config(state='normal')
+            status_text.insert(tk.END, '\n'.join(lines) + '\n')
+            # Keep scrollback bounded; the Text widget has a trailing empty line
+            excess = int(status_text.index('end-1c').split('.')[0]) - 1 - GUI_LOG_LINES
+            if excess > 0:
+                status_text.delete('1.0', f'{excess + 1}.0')
+            status_text.see(tk.END)
+            status_text.config(state='disabled')
+        root.after(GUI_DRAIN_MS, drain_events)
+    root.after(GUI_DRAIN_MS, drain_events)
+
+    # Live preview: parameter edits are debounced, a newer request cancels the
+    # trace still running for an older one, and rendered previews are cached
+    preview_cache = PreviewCache()
+    preview_job = None
+    preview_control = None
+    preview_key = None
+
+    def schedule_preview():
+        nonlocal preview_job
+        if preview_job is not None:
+            root.after_cancel(preview_job)
+        preview_job = root.after(PREVIEW_DEBOUNCE_MS, start_preview)
+
+    def start_preview():
+        nonlocal preview_job, preview_control, preview_key
+        preview_job = None
+        if not files_list.size():
+            return
+        selection = files_list.curselection()
+        image_path = files_list.get(selection[0] if selection else 0)
+        try:
+            vparams = {k: v.get() for k, v in params.items()}
+        except (tk.TclError, ValueError):
+            return  # a number is still being typed
+        try:
+            key = preview_cache.key(image_path, vparams)
+        except OSError as e:
+            preview_label.config(image='', text=f"Preview failed: {e}")
+            return
+        if preview_control is not None:
+            preview_control.cancel()
+            preview_control = None
+        preview_key = key
+        cached = preview_cache.get(key)
+        if cached is not None:
+            show_preview(key, cached)
+            return
+        control = preview_control = BatchControl()
+        def render():
+            try:
+                image = render_preview(image_path, vparams, control=control)
+                data = io.BytesIO()
+                image.save(data, format='PNG')
+                events.put(('preview', (key, base64.b64encode(data.getvalue()).decode('ascii'))))
+            except ConversionCancelled:
+                pass
+            except Exception as e:
+                events.put(('preview', (key, e)))
+        threading.Thread(target=render, daemon=True).start()
 
-    def do_vectorize():
+    def show_preview(key, result):
+        if isinstance(result, Exception):
+            if key == preview_key:
+                preview_label.config(image='', text=f"Preview failed: {result}")
+            return
+        preview_cache.put(key, result)
+        if key != preview_key:
+            return  # finished after the settings moved on; cached for flipping back
+        photo = tk.PhotoImage(data=result)
+        preview_label.config(image=photo, text='')
+        preview_label.image = photo  # Tk keeps no reference of its own
+
+    for var in params.values():
+        var.trace_add('write', lambda *args: schedule_preview())
+
+    def do_vectorize(files, outdir, vparams, control):
+        # Whatever goes wrong, the window must hear that the batch is over
+        # or Start stays disabled for the rest of the session
+        try:
+            allocator = OutputAllocator(outdir)
+            pixels = [estimate_cost(f) for f in files]
+            progress = ProgressTracker(pixels)
+            events.put(('batch', progress))
+            successful = 0
+            failed = 0
+            for file_path, file_pixels in zip(files, pixels):
+                if not control.wait():
+                    break
+                output_path = None
+                started = time.perf_counter()
+                try:
+                    input_path = Path(file_path)
+                    output_path = allocator.reserve()
+                    log(f"Vectorizing: {input_path.name} ...")
+                    vectorize_image(
+                        input_path,
+                        output_path,
+                        control=control,
+                        **vparams
+                    )
+                    log(f"✓ Successfully created: {output_path}")
+                    successful += 1
+                    progress.job_done(file_pixels, time.perf_counter() - started)
+                except ConversionCancelled:
+                    log(f"✗ Cancelled: {file_path}")
+                    release_output(output_path)
+                    break
+                except Exception as e:
+                    log(f"✗ Failed to process {file_path}: {e}")
+                    if output_path is not None:
+                        release_output(output_path)
+                    failed += 1
+                    progress.job_done(file_pixels, time.perf_counter() - started, ok=False)
+            summary = f"\n--- Summary ---\nSuccessful: {successful}\nFailed: {failed}\n"
+            if control.cancelled:
+                summary += f"Not processed (cancelled): {len(files) - successful - failed}\n"
+            log(summary + f"Total: {len(files)}\n")
+        except Exception as e:
+            log(f"✗ Batch stopped: {e}")
+        finally:
+            events.put(('finished', None))
+
+    control = None
+
+    def start_vectorize_thread():
+        nonlocal control
+        # Read the form on the main thread; Tk variables aren't safe to use from workers
         files = files_var.get().split(';') if files_var.get() else []
         if not files:
             messagebox.showerror("No files", "Please select at least one image file.")
@@ -210,37 +2689,112 @@ def run_gui():
             outdir = script_dir
         # Collect params
         vparams = {k: v.get() for k, v in params.items()}
-        successful = 0
-        failed = 0
-        for file_path in files:
-            try:
-                input_path = Path(file_path)
-                output_path = get_next_svg_filename(outdir)
-                log(f"Vectorizing: {input_path.name} ...")
-                vectorize_image(
-                    input_path,
-                    output_path,
-                    **vparams
-                )
-                log(f"✓ Successfully created: {output_path}")
-                successful += 1
-            except Exception as e:
-                log(f"✗ Failed to process {file_path}: {e}")
-                failed += 1
-        log(f"\n--- Summary ---\nSuccessful: {successful}\nFailed: {failed}\nTotal: {len(files)}\n")
+        control = BatchControl()
+        start_button.config(state='disabled')
+        pause_button.config(state='normal', text="Pause")
+        cancel_button.config(state='normal')
+        threading.Thread(target=do_vectorize, args=(files, outdir, vparams, control), daemon=True).start()
 
-    def start_vectorize_thread():
-        threading.Thread(target=do_vectorize, daemon=True).start()
+    def toggle_pause():
+        if control.paused:
+            control.resume()
+            pause_button.config(text="Pause")
+            log("Resumed")
+        else:
+            # The running image finishes; no new one starts until Resume
+            control.pause()
+            pause_button.config(text="Resume")
+            log("Paused after the current image")
+
+    def cancel_batch():
+        control.cancel()
+        pause_button.config(state='disabled')
+        cancel_button.config(state='disabled')
+        log("Cancelling...")
 
-    tk.Button(root, text="Start Vectorization", command=start_vectorize_thread, bg="#4CAF50", fg="white").pack(pady=10)
+    def batch_finished():
+        start_button.config(state='normal')
+        pause_button.config(state='disabled', text="Pause")
+        cancel_button.config(state='disabled')
+
+    button_frame = tk.Frame(root)
+    button_frame.pack(pady=10)
+    start_button = tk.Button(button_frame, text="Start Vectorization", command=start_vectorize_thread,
+                             bg="#4CAF50", fg="white")
+    start_button.pack(side='left')
+    pause_button = tk.Button(button_frame, text="Pause", command=toggle_pause, state='disabled')
+    pause_button.pack(side='left', padx=5)
+    cancel_button = tk.Button(button_frame, text="Cancel", command=cancel_batch, state='disabled')
+    cancel_button.pack(side='left')
     root.mainloop()
 
 def main():
     parser = argparse.ArgumentParser(description='Vectorize images using VTracer with optimized settings')
-    parser.add_argument('files', nargs='*', help='Input image files')
+    parser.add_argument('files', nargs='*', help='Input image files or directories')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                       help='Also take images from subdirectories of directory arguments')
+    parser.add_argument('--include', action='append', metavar='PATTERN',
+                       help='Only take directory images matching this glob (name or relative path); repeatable')
+    parser.add_argument('--exclude', action='append', metavar='PATTERN',
+                       help='Skip directory images and subdirectories matching this glob; repeatable')
     parser.add_argument('--output-dir', '-o', help='Output directory for SVG files')
     parser.add_argument('--gui', action='store_true', help='Use GUI file picker')
     parser.add_argument('--simple-gui', action='store_true', help='Launch the simple GUI')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                       help='Number of images to vectorize in parallel (default: CPU count)')
+    parser.add_argument('--watch', metavar='DIR',
+                       help='Keep running and vectorize images as they appear in DIR')
+    parser.add_argument('--settle', type=float, default=1.0,
+                       help='Seconds a watched file must be unchanged before it is traced (default: 1.0)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Skip inputs that are unchanged since they were last traced with the same settings')
+    parser.add_argument('--manifest',
+                       help='Manifest file for --incremental (default: .vtracer-manifest.json in the output directory)')
+    parser.add_argument('--journal', help='Log batch progress to this file so it can be resumed')
+    parser.add_argument('--resume', metavar='JOURNAL',
+                       help='Continue the unfinished work recorded in a batch journal')
+    parser.add_argument('--metrics-json', help='Write per-file timing metrics to this JSON file')
+    parser.add_argument('--max-pixels', type=int,
+                       help='Downscale images with more pixels than this before tracing (needs Pillow)')
+    parser.add_argument('--max-dimension', type=int,
+                       help='Downscale images wider or taller than this before tracing (needs Pillow)')
+    parser.add_argument('--palette', type=int,
+                       help='Reduce color images to this many colors before tracing (needs Pillow and NumPy)')
+    parser.add_argument('--optimize', action='store_true',
+                       help='Shrink SVGs by rounding coordinates and rewriting paths compactly')
+    parser.add_argument('--precision', type=int, default=2,
+                       help='Decimal places kept by --optimize (default: 2)')
+    parser.add_argument('--svgz', action='store_true',
+                       help='Write gzip-compressed .svgz files instead of .svg')
+    parser.add_argument('--compression-level', type=int, default=9, choices=range(1, 10), metavar='1-9',
+                       help='gzip level for --svgz (default: 9)')
+    parser.add_argument('--tile-size', type=int,
+                       help='Trace images larger than this many pixels across in parallel tiles (needs Pillow)')
+    parser.add_argument('--tile-overlap', type=int, default=32,
+                       help='Pixels of overlap between neighbouring tiles (default: 32)')
+    parser.add_argument('--tile-jobs', type=int,
+                       help='Tiles of one image traced in parallel (default: CPU count divided by --jobs)')
+    parser.add_argument('--timeout', type=float,
+                       help='Kill a VTracer process that runs longer than this many seconds')
+    parser.add_argument('--cpu-limit', type=float,
+                       help='CPU seconds each VTracer process may use (POSIX only)')
+    parser.add_argument('--memory-limit', type=int,
+                       help='Address space in MB each VTracer process may use (POSIX only)')
+    parser.add_argument('--vtracer', help=f'Path to the VTracer binary (default: ${VTRACER_ENV}, bundled binary, then PATH)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adjust parallelism to load and free memory while running, up to --jobs')
+    parser.add_argument('--min-jobs', type=int, default=1,
+                       help='Lowest parallelism --adaptive may drop to (default: 1)')
+    parser.add_argument('--order', choices=['largest', 'input'],
+                       help='Start the largest images first, or keep input order (default: largest; '
+                            'directory inputs are streamed in the order found)')
+    parser.add_argument('--history', action='store_true',
+                       help='Order by conversion times recorded in earlier runs (kept in the cache directory)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always run VTracer, bypassing the result cache')
+    parser.add_argument('--cache-dir', help=f'Result cache directory (default: {default_cache_dir()})')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                       help='Maximum result cache size in MB (default: 1024)')
     
     # VTracer parameters with your specified defaults
     parser.add_argument('--colormode', choices=['color', 'binary'], 
@@ -263,33 +2817,148 @@ def main():
                        help='Splice Threshold - less accurate (default: 0)')
     
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.min_jobs < 1 or args.min_jobs > args.jobs:
+        parser.error('--min-jobs must be between 1 and --jobs')
+    if args.tile_jobs is not None and args.tile_jobs < 1:
+        parser.error('--tile-jobs must be at least 1')
+    if args.tile_size is not None and args.tile_size <= args.tile_overlap * 2:
+        parser.error('--tile-size must be more than twice --tile-overlap')
+    if args.precision < 0:
+        parser.error('--precision cannot be negative')
+    if args.palette is not None and not 2 <= args.palette <= 256:
+        parser.error('--palette must be between 2 and 256')
+    if args.watch and not os.path.isdir(args.watch):
+        parser.error(f'--watch directory not found: {args.watch}')
+    if args.watch and (args.files or args.incremental or args.manifest or args.adaptive
+                       or args.order or args.history):
+        parser.error('--watch cannot be combined with input files, --incremental, --manifest, '
+                     '--adaptive, --order or --history')
+    if args.journal and (args.watch or args.resume):
+        parser.error('--journal only applies to a new batch')
+    if args.resume and (args.files or args.watch or args.incremental or args.manifest):
+        parser.error('--resume takes its files and settings from the journal')
+    
+    resume_tasks = None
+    if args.resume:
+        try:
+            batch, journal_jobs = Journal.load(args.resume)
+        except (OSError, ValueError) as e:
+            parser.error(f'cannot read journal: {e}')
+        # Continue with the original output directory and settings; journals
+        # from before options were recorded only have the VTracer parameters
+        args.output_dir = batch['output_dir']
+        resume_options = batch.get('options', batch['params'])
+        for name in VTRACER_DEFAULTS:
+            if name in resume_options:
+                setattr(args, name, resume_options[name])
+        resume_tasks = [(job['input'], output) for output, job in journal_jobs.items()
+                        if job['state'] in ('queued', 'started')]
+        done = sum(1 for job in journal_jobs.values() if job['state'] == 'done')
+        print(f"Resuming {args.resume}: {done} done, "
+              f"{len(journal_jobs) - done - len(resume_tasks)} failed, {len(resume_tasks)} left"
+              + (", plus images not reached yet" if batch.get('sources') else ""))
     
     # Check if VTracer is installed
-    if not check_vtracer_installed():
+    if not check_vtracer_installed(args.vtracer):
         install_vtracer()
         return 1
     
+    # Prepare output directory
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        output_dir = Path(os.path.abspath(os.path.dirname(__file__)))
+    
+    vparams = dict(
+        colormode=args.colormode,
+        hierarchical=args.hierarchical,
+        mode=args.mode,
+        filter_speckle=args.filter_speckle,
+        color_precision=args.color_precision,
+        gradient_step=args.gradient_step,
+        corner_threshold=args.corner_threshold,
+        segment_length=args.segment_length,
+        splice_threshold=args.splice_threshold
+    )
+    if args.tile_size:
+        # Without --tile-jobs, run_batch() shares the CPUs out between the images it runs
+        vparams.update(tile_size=args.tile_size, tile_overlap=args.tile_overlap, tile_jobs=args.tile_jobs)
+    if args.max_pixels or args.max_dimension:
+        vparams.update(max_pixels=args.max_pixels, max_dimension=args.max_dimension)
+    if args.palette:
+        vparams.update(palette=args.palette)
+    if args.optimize:
+        vparams.update(optimize_precision=args.precision)
+    if args.svgz:
+        vparams.update(compress_level=args.compression_level)
+    if args.timeout or args.cpu_limit or args.memory_limit:
+        vparams.update(timeout=args.timeout, cpu_limit=args.cpu_limit,
+                       memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None)
+    if args.resume:
+        vparams = dict(resume_options)
+    
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+    
+    manifest = None
+    if args.incremental or args.manifest:
+        manifest = Manifest(args.manifest or output_dir / '.vtracer-manifest.json')
+    
+    # Per-job metrics are only kept for --metrics-json, so watch mode and huge
+    # directory trees don't grow a list forever; the summary needs just counts
+    jobs_metrics = [] if args.metrics_json else None
+    status_counts = {'timeout': 0, 'limited': 0}
+    counts_lock = threading.Lock()
+    def on_metrics(metrics):
+        if metrics['status'] in status_counts:
+            with counts_lock:
+                status_counts[metrics['status']] += 1
+        if jobs_metrics is not None:
+            jobs_metrics.append(metrics)
+    
+    journal = None
+    if args.resume or args.journal:
+        journal = Journal(args.resume or args.journal)
+    
     # Get input files
-    if args.gui or not args.files:
+    sources = None
+    if args.watch:
+        files = None
+    elif resume_tasks is not None:
+        files = []
+        if batch.get('sources'):
+            # A directory batch stopped partway: list its directories again and
+            # queue whatever the journal has not seen, after the unfinished jobs
+            known = {job['input'] for job in journal_jobs.values()}
+            files = (f for f in iter_image_files(**batch['sources'])
+                     if os.path.abspath(f) not in known)
+    elif args.gui or not args.files:
         files = select_files_gui()
         if not files:
             print("No files selected.")
             return 0
+    elif any(os.path.isdir(f) for f in args.files):
+        # Listed lazily and fed to the batch as it goes
+        sources = dict(paths=[os.path.abspath(f) for f in args.files], recursive=args.recursive,
+                       include=args.include, exclude=args.exclude)
+        files = iter_image_files(**sources)
     else:
         files = args.files
     
-    # Prepare output directory
-    if args.output_dir:
-        output_dir = Path(args.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
+    if files is None:
+        print(f"\nWatching for new images with your optimized settings...")
+    elif resume_tasks is not None:
+        print(f"\nProcessing {len(resume_tasks)} file(s)"
+              f"{' and the images not reached yet' if batch.get('sources') else ''}"
+              f" with your optimized settings...")
+    elif isinstance(files, (list, tuple)):
+        print(f"\nProcessing {len(files)} file(s) with your optimized settings...")
     else:
-        output_dir = Path(os.path.abspath(os.path.dirname(__file__)))
-    
-    # Process files
-    successful = 0
-    failed = 0
-    
-    print(f"\nProcessing {len(files)} file(s) with your optimized settings...")
+        print(f"\nProcessing images from {len(args.files)} path(s) with your optimized settings...")
     print("Settings:")
     print(f"  Color Mode: {args.colormode}")
     print(f"  Hierarchical: {args.hierarchical}")
@@ -300,37 +2969,51 @@ def main():
     print(f"  Corner Threshold: {args.corner_threshold}")
     print(f"  Segment Length: {args.segment_length}")
     print(f"  Splice Threshold: {args.splice_threshold}")
+    print(f"  Jobs: {args.jobs}")
     print()
     
-    for file_path in files:
+    # Process files
+    start = time.perf_counter()
+    if files is None:
+        if vparams.get('tile_size') and not vparams.get('tile_jobs'):
+            # Any number of watched images may arrive at once, so plan for all workers tiling
+            vparams['tile_jobs'] = max(1, (os.cpu_count() or 1) // args.jobs)
+        successful, failed = watch_and_vectorize(
+            args.watch, output_dir, jobs=args.jobs, settle=args.settle,
+            on_metrics=on_metrics, cache=cache, **vparams)
+    else:
+        adaptive = AdaptiveConcurrency(args.min_jobs, args.jobs) if args.adaptive else None
+        # Sorting by size needs the whole list, so directory inputs stream in the order found
+        schedule = args.order or ('largest' if isinstance(files, (list, tuple)) else 'input')
+        history = None
+        if args.history:
+            history = TimingHistory(Path(args.cache_dir) / 'timings.json' if args.cache_dir else None)
         try:
-            input_path = Path(file_path)
-            
-            output_path = get_next_svg_filename(output_dir)
-            
-            vectorize_image(
-                input_path, 
-                output_path,
-                colormode=args.colormode,
-                hierarchical=args.hierarchical,
-                mode=args.mode,
-                filter_speckle=args.filter_speckle,
-                color_precision=args.color_precision,
-                gradient_step=args.gradient_step,
-                corner_threshold=args.corner_threshold,
-                segment_length=args.segment_length,
-                splice_threshold=args.splice_threshold
-            )
-            successful += 1
-            
-        except Exception as e:
-            print(f"✗ Failed to process {file_path}: {e}")
-            failed += 1
+            successful, failed = run_batch(
+                files, output_dir, jobs=args.jobs, on_metrics=on_metrics, manifest=manifest,
+                journal=journal, tasks=resume_tasks, adaptive=adaptive, schedule=schedule,
+                history=history, sources=sources, cache=cache, **vparams)
+        except KeyboardInterrupt:
+            print("\nInterrupted." + (f" Continue with --resume {journal.path}" if journal else ""))
+            return 130
+        finally:
+            if journal is not None:
+                journal.close()
     
     print(f"\n--- Summary ---")
     print(f"Successful: {successful}")
     print(f"Failed: {failed}")
-    print(f"Total: {len(files)}")
+    if vparams.get('timeout') or vparams.get('cpu_limit') or vparams.get('memory_limit'):
+        print(f"  Timed out: {status_counts['timeout']}")
+        print(f"  Resource limited: {status_counts['limited']}")
+    if manifest is not None:
+        print(f"Skipped (up to date): {manifest.skipped}")
+    print(f"Total: {successful + failed + (manifest.skipped if manifest else 0)}")
+    if cache is not None:
+        print(f"Cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    if args.metrics_json:
+        write_metrics_json(args.metrics_json, jobs_metrics, time.perf_counter() - start)
+        print(f"Metrics written to {args.metrics_json}")
     
     if args.simple_gui:
         run_gui()
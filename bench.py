@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the VTracer wrapper
+Run `python bench.py startup` to time headless CLI startup
+Run `python bench.py run` to measure conversion throughput on a synthetic corpus
+Run `python bench.py sweep` to search VTracer parameters for fast, compact settings
+"""
+
+import os
+import sys
+import io
+import json
+import math
+import time
+import itertools
+import zlib
+import random
+import struct
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+import Main
+
+MAIN = Path(os.path.abspath(os.path.dirname(__file__))) / 'Main.py'
+
+# Parameter presets for throughput runs, layered over Main.VTRACER_DEFAULTS
+PRESETS = {
+    'default': {},
+    'fast': {'mode': 'polygon', 'filter_speckle': 8, 'color_precision': 4,
+             'gradient_step': 64, 'segment_length': 10},
+    'detailed': {'filter_speckle': 2, 'color_precision': 8, 'gradient_step': 16,
+                 'corner_threshold': 60, 'segment_length': 4},
+    'binary': {'colormode': 'binary'},
+    # Color pre-quantization (needs Pillow and NumPy)
+    'palette16': {'palette': 16},
+    'palette64': {'palette': 64},
+}
+
+# Parameters searched by `sweep`, with their default candidate values
+SWEEP_PARAMS = {
+    'filter_speckle': (int, '2,4,8'),
+    'color_precision': (int, '4,6,8'),
+    'gradient_step': (int, '16,55'),
+    'corner_threshold': (int, '60,105'),
+    'segment_length': (float, '4,7.5'),
+}
+
+CORPUS_KINDS = ('logo', 'lineart', 'gradient', 'photo')
+DEFAULT_SIZES = (256, 512, 1024)
+
+# Modules a headless run must never load
+GUI_MODULES = ('tkinter', '_tkinter')
+
+def imported_modules(importtime_output):
+    """Module names from `python -X importtime` output"""
+    modules = set()
+    for line in importtime_output.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            modules.add(name.split('.')[0])
+    return modules
+
+def bench_startup(runs=10):
+    """
+    Time the headless `Main.py files... -o out` path and check that it does
+    not import tkinter. Returns a dict of timings in seconds.
+    """
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # A missing input keeps VTracer out of the measurement
+        cmd = [sys.executable, '-X', 'importtime', str(MAIN),
+               os.path.join(tmp, 'missing.png'), '-o', tmp, '--no-cache']
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            timings.append(time.perf_counter() - start)
+            loaded = imported_modules(result.stderr) & set(GUI_MODULES)
+            if loaded:
+                raise AssertionError(f"Headless run imported {', '.join(sorted(loaded))}")
+    return {
+        'runs': runs,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+    }
+
+def write_png(path, width, height, rows):
+    """Write 8-bit RGB rows (bytes of length width * 3) as a PNG file"""
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+    raw = b''.join(b'\x00' + bytes(row) for row in rows)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+        f.write(chunk(b'IEND', b''))
+
+def _random_color(rng):
+    return bytes(rng.randrange(256) for _ in range(3))
+
+def _logo_rows(size, rng):
+    """Flat-colored rectangles and circles on a white background"""
+    pixels = bytearray(b'\xff' * (size * size * 3))
+    for _ in range(6):
+        color = _random_color(rng)
+        x0, y0 = rng.randrange(size // 2), rng.randrange(size // 2)
+        w, h = rng.randrange(size // 8, size // 2), rng.randrange(size // 8, size // 2)
+        for y in range(y0, y0 + h):
+            start = (y * size + x0) * 3
+            pixels[start:start + w * 3] = color * w
+    for _ in range(4):
+        color = _random_color(rng)
+        cx, cy, r = rng.randrange(size), rng.randrange(size), rng.randrange(size // 16, size // 4)
+        for y in range(max(0, cy - r), min(size, cy + r)):
+            half = int(math.sqrt(r * r - (y - cy) ** 2))
+            x0, x1 = max(0, cx - half), min(size, cx + half)
+            if x1 > x0:
+                pixels[(y * size + x0) * 3:(y * size + x1) * 3] = color * (x1 - x0)
+    return [pixels[y * size * 3:(y + 1) * size * 3] for y in range(size)]
+
+def _lineart_rows(size, rng):
+    """Black strokes on a white background"""
+    pixels = bytearray(b'\xff' * (size * size))
+    thickness = max(1, size // 256)
+    for _ in range(24):
+        x0, y0, x1, y1 = (rng.randrange(size) for _ in range(4))
+        steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+        for i in range(steps + 1):
+            x = x0 + (x1 - x0) * i // steps
+            y = y0 + (y1 - y0) * i // steps
+            for dy in range(thickness):
+                row = min(size - 1, y + dy)
+                end = min(size, x + thickness)
+                pixels[row * size + x:row * size + end] = bytes(end - x)
+    # Expand grayscale to RGB
+    return [bytes(b for v in pixels[y * size:(y + 1) * size] for b in (v, v, v))
+            for y in range(size)]
+
+def _gradient_rows(size, rng):
+    """Smooth two-axis color gradient"""
+    blue = rng.randrange(256)
+    reds = bytes(x * 255 // max(1, size - 1) for x in range(size))
+    rows = []
+    for y in range(size):
+        row = bytearray(size * 3)
+        row[0::3] = reds
+        row[1::3] = bytes([y * 255 // max(1, size - 1)]) * size
+        row[2::3] = bytes([blue]) * size
+        rows.append(row)
+    return rows
+
+def _photo_rows(size, rng):
+    """Low-frequency color fields plus per-pixel noise, roughly photo-like"""
+    waves = [(rng.uniform(1, 6), rng.uniform(1, 6), rng.uniform(0, math.tau)) for _ in range(3)]
+    rows = []
+    for y in range(size):
+        noise = rng.getrandbits(8 * size * 3).to_bytes(size * 3, 'little')
+        row = bytearray(size * 3)
+        for x in range(size):
+            for c, (fx, fy, phase) in enumerate(waves):
+                base = 127 + 100 * math.sin(fx * x / size * math.tau + fy * y / size * math.tau + phase)
+                row[x * 3 + c] = max(0, min(255, int(base) + noise[x * 3 + c] // 8 - 16))
+        rows.append(row)
+    return rows
+
+CORPUS_GENERATORS = {
+    'logo': _logo_rows,
+    'lineart': _lineart_rows,
+    'gradient': _gradient_rows,
+    'photo': _photo_rows,
+}
+
+def generate_corpus(corpus_dir, sizes=DEFAULT_SIZES, kinds=CORPUS_KINDS, seed=0):
+    """
+    Write the synthetic benchmark images to corpus_dir and return their paths.
+    The same seed always produces byte-identical files; existing files are reused.
+    """
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for kind in kinds:
+        for size in sizes:
+            path = corpus_dir / f"{kind}_{size}.png"
+            if not path.exists():
+                rng = random.Random(f"{seed}:{kind}:{size}")
+                write_png(path, size, size, CORPUS_GENERATORS[kind](size, rng))
+            paths.append(path)
+    return paths
+
+def png_size(path):
+    """(width, height) read from a PNG header"""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    return struct.unpack('>II', header[16:24])
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def bench_throughput(images, params, jobs, repeat=1):
+    """
+    Vectorize every image `repeat` times with up to `jobs` in parallel and
+    return throughput, latency percentiles and output size.
+    """
+    work = [path for _ in range(repeat) for path in images]
+    megapixels = {}
+    for path in images:
+        width, height = png_size(path)
+        megapixels[path] = width * height / 1e6
+    latencies = []
+    done_megapixels = 0.0
+    output_bytes = 0
+    failed = 0
+    
+    def convert(index, path, out_dir):
+        output_path = Path(out_dir) / f"{index}.svg"
+        start = time.perf_counter()
+        Main.vectorize_image(path, output_path, **params)
+        elapsed = time.perf_counter() - start
+        return elapsed, output_path.stat().st_size
+    
+    with tempfile.TemporaryDirectory() as out_dir:
+        # vectorize_image() reports every file; keep the benchmark output readable
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(convert, i, path, out_dir) for i, path in enumerate(work)]
+                for path, future in zip(work, futures):
+                    try:
+                        elapsed, size = future.result()
+                    except Exception:
+                        failed += 1
+                        continue
+                    latencies.append(elapsed)
+                    done_megapixels += megapixels[path]
+                    output_bytes += size
+            wall = time.perf_counter() - start
+    
+    done = len(latencies)
+    return {
+        'images': len(work),
+        'failed': failed,
+        'wall_seconds': wall,
+        'images_per_sec': done / wall if wall else 0.0,
+        'megapixels_per_sec': done_megapixels / wall if wall else 0.0,
+        'latency_p50': percentile(latencies, 50) if latencies else None,
+        'latency_p95': percentile(latencies, 95) if latencies else None,
+        'latency_p99': percentile(latencies, 99) if latencies else None,
+        'output_bytes': output_bytes,
+    }
+
+def sweep_combinations(grid, search='grid', trials=None, seed=0):
+    """
+    Parameter combinations to try: the full grid, or `trials` distinct
+    combinations drawn from it at random.
+    """
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    if search == 'random' and trials and trials < len(combos):
+        combos = random.Random(seed).sample(combos, trials)
+    return combos
+
+def pareto_frontier(results, keys=('trace_seconds', 'output_bytes')):
+    """Results not beaten on every key by another result, fastest first"""
+    frontier = []
+    best = None
+    for result in sorted(results, key=lambda r: tuple(r[k] for k in keys)):
+        if best is None or result[keys[1]] < best:
+            frontier.append(result)
+            best = result[keys[1]]
+    return frontier
+
+def bench_sweep(images, combos, base_params, jobs):
+    """
+    Trace every image with every parameter combination, up to `jobs` at a time.
+    Returns one result per combination with summed trace time, output bytes
+    and path count over the sample set.
+    """
+    results = [{'params': combo, 'trace_seconds': 0.0, 'output_bytes': 0, 'paths': 0, 'failed': 0}
+               for combo in combos]
+    
+    def convert(index, path, out_dir, params):
+        output_path = Path(out_dir) / f"{index}.svg"
+        start = time.perf_counter()
+        Main.vectorize_image(path, output_path, **params)
+        elapsed = time.perf_counter() - start
+        with open(output_path, 'rb') as f:
+            paths = f.read().count(b'<path')
+        size = output_path.stat().st_size
+        output_path.unlink()
+        return elapsed, size, paths
+    
+    with tempfile.TemporaryDirectory() as out_dir:
+        with redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                futures = []
+                for c, combo in enumerate(combos):
+                    params = {**base_params, **combo}
+                    for i, path in enumerate(images):
+                        futures.append((c, pool.submit(convert, f"{c}_{i}", path, out_dir, params)))
+                for c, future in futures:
+                    try:
+                        elapsed, size, paths = future.result()
+                    except Exception:
+                        results[c]['failed'] += 1
+                        continue
+                    results[c]['trace_seconds'] += elapsed
+                    results[c]['output_bytes'] += size
+                    results[c]['paths'] += paths
+    return results
+
+def _csv(value, cast=str):
+    return [cast(v) for v in value.split(',') if v]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the VTracer wrapper')
+    sub = parser.add_subparsers(dest='command', required=True)
+    startup = sub.add_parser('startup', help='Time headless CLI startup')
+    startup.add_argument('--runs', type=int, default=10, help='Number of runs (default: 10)')
+    
+    corpus = sub.add_parser('corpus', help='Generate the synthetic image corpus')
+    corpus.add_argument('dir', help='Directory to write the corpus to')
+    
+    run = sub.add_parser('run', help='Measure conversion throughput on the synthetic corpus')
+    run.add_argument('--corpus', help='Corpus directory (default: a temporary directory)')
+    run.add_argument('--presets', default='default,fast',
+                     help=f"Comma-separated presets from: {', '.join(PRESETS)} (default: default,fast)")
+    run.add_argument('--jobs', default=f"1,{os.cpu_count() or 1}",
+                     help='Comma-separated job counts to try (default: 1,CPU count)')
+    run.add_argument('--repeat', type=int, default=1, help='Passes over the corpus (default: 1)')
+    run.add_argument('--json', help='Write results to this JSON file')
+    run.add_argument('--vtracer', help='Path to the VTracer binary')
+    
+    sweep = sub.add_parser('sweep', help='Search VTracer parameters and print the time/size Pareto frontier')
+    sweep.add_argument('images', nargs='*', help='Sample images (default: the synthetic corpus)')
+    sweep.add_argument('--corpus', help='Corpus directory when no images are given (default: a temporary directory)')
+    sweep.add_argument('--search', choices=['grid', 'random'], default='grid',
+                       help='Try every combination, or a random subset of --trials (default: grid)')
+    sweep.add_argument('--trials', type=int, default=20, help='Combinations to try with --search random (default: 20)')
+    sweep.add_argument('--preset', default='default',
+                       help='Preset for the parameters not being swept (default: default)')
+    for name, (_, default) in SWEEP_PARAMS.items():
+        sweep.add_argument(f"--{name.replace('_', '-')}", default=default,
+                           help=f"Comma-separated values to try (default: {default})")
+    sweep.add_argument('--max-bytes', type=int, help='Report the fastest settings with total output at most this size')
+    sweep.add_argument('--max-paths', type=int, help='Report the fastest settings with at most this many paths in total')
+    sweep.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='Conversions to run in parallel (default: CPU count)')
+    sweep.add_argument('--json', help='Write all results to this JSON file')
+    sweep.add_argument('--vtracer', help='Path to the VTracer binary')
+    
+    for p in (corpus, run, sweep):
+        p.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                       help='Comma-separated image sizes in pixels (default: 256,512,1024)')
+        p.add_argument('--kinds', default=','.join(CORPUS_KINDS),
+                       help=f"Comma-separated image kinds (default: {','.join(CORPUS_KINDS)})")
+        p.add_argument('--seed', type=int, default=0, help='Corpus random seed (default: 0)')
+    
+    args = parser.parse_args()
+    
+    if args.command in ('corpus', 'run', 'sweep'):
+        sizes = _csv(args.sizes, int)
+        kinds = _csv(args.kinds)
+        unknown = set(kinds) - set(CORPUS_KINDS)
+        if unknown:
+            parser.error(f"Unknown image kind(s): {', '.join(sorted(unknown))}")
+    
+    if args.command == 'corpus':
+        paths = generate_corpus(args.dir, sizes, kinds, args.seed)
+        print(f"✓ Wrote {len(paths)} image(s) to {args.dir}")
+        return 0
+    
+    if args.command == 'sweep':
+        if args.preset not in PRESETS:
+            parser.error(f"Unknown preset: {args.preset}")
+        grid = {name: _csv(getattr(args, name), cast) for name, (cast, _) in SWEEP_PARAMS.items()}
+        combos = sweep_combinations(grid, args.search, args.trials)
+        if not Main.check_vtracer_installed(args.vtracer):
+            Main.install_vtracer()
+            return 1
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            images = [Path(p) for p in args.images] or generate_corpus(args.corpus or tmp, sizes, kinds, args.seed)
+            print(f"Sweeping {len(combos)} combination(s) over {len(images)} image(s)...")
+            base_params = {**Main.VTRACER_DEFAULTS, **PRESETS[args.preset]}
+            results = bench_sweep(images, combos, base_params, args.jobs)
+        
+        ok = [r for r in results if not r['failed']]
+        names = list(SWEEP_PARAMS)
+        header = ' '.join(f"{n:>17}" for n in names)
+        print(f"\nPareto frontier (trace time vs output size):")
+        print(f"{header} {'time s':>8} {'bytes':>10} {'paths':>7}")
+        for r in pareto_frontier(ok):
+            values = ' '.join(f"{r['params'][n]:>17}" for n in names)
+            print(f"{values} {r['trace_seconds']:8.3f} {r['output_bytes']:>10} {r['paths']:>7}")
+        failed = len(results) - len(ok)
+        if failed:
+            print(f"  ✗ {failed} combination(s) had failed conversions and were left out")
+        
+        if args.max_bytes is not None or args.max_paths is not None:
+            eligible = [r for r in ok
+                        if (args.max_bytes is None or r['output_bytes'] <= args.max_bytes)
+                        and (args.max_paths is None or r['paths'] <= args.max_paths)]
+            if eligible:
+                best = min(eligible, key=lambda r: r['trace_seconds'])
+                settings = ' '.join(f"--{n.replace('_', '-')} {v}" for n, v in best['params'].items())
+                print(f"\nFastest settings meeting the target: {settings}")
+            else:
+                print("\nNo combination met the target")
+        
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'vtracer_version': Main.get_vtracer_version(),
+                           'base_params': base_params, 'results': results}, f, indent=2)
+            print(f"\nResults written to {args.json}")
+        return 0
+    
+    if args.command == 'run':
+        presets = _csv(args.presets)
+        unknown = set(presets) - set(PRESETS)
+        if unknown:
+            parser.error(f"Unknown preset(s): {', '.join(sorted(unknown))}")
+        job_counts = _csv(args.jobs, int)
+        if not Main.check_vtracer_installed(args.vtracer):
+            Main.install_vtracer()
+            return 1
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            images = generate_corpus(args.corpus or tmp, sizes, kinds, args.seed)
+            results = []
+            print(f"{'preset':<10} {'jobs':>4} {'img/s':>8} {'MP/s':>8} "
+                  f"{'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'bytes':>12}")
+            for preset in presets:
+                params = {**Main.VTRACER_DEFAULTS, **PRESETS[preset]}
+                for jobs in job_counts:
+                    stats = bench_throughput(images, params, jobs, args.repeat)
+                    results.append({'preset': preset, 'jobs': jobs, 'params': params, **stats})
+                    fmt = lambda v: f"{v:8.3f}" if v is not None else f"{'-':>8}"
+                    print(f"{preset:<10} {jobs:>4} {fmt(stats['images_per_sec'])} "
+                          f"{fmt(stats['megapixels_per_sec'])} {fmt(stats['latency_p50'])} "
+                          f"{fmt(stats['latency_p95'])} {fmt(stats['latency_p99'])} "
+                          f"{stats['output_bytes']:>12}")
+                    if stats['failed']:
+                        print(f"  ✗ {stats['failed']} conversion(s) failed")
+        
+        if args.json:
+            report = {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'vtracer_version': Main.get_vtracer_version(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'corpus': {'sizes': sizes, 'kinds': kinds, 'seed': args.seed, 'repeat': args.repeat},
+                'results': results,
+            }
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults written to {args.json}")
+        return 0
+    
+    if args.command == 'startup':
+        try:
+            stats = bench_startup(args.runs)
+        except AssertionError as e:
+            print(f"✗ {e}")
+            return 1
+        print(f"✓ Headless startup does not import tkinter")
+        print(f"Startup over {stats['runs']} run(s): "
+              f"min {stats['min'] * 1000:.1f} ms, median {stats['median'] * 1000:.1f} ms, "
+              f"max {stats['max'] * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+
+def make_tree(root):
+    for relative in ('a.png', 'b.JPG', 'notes.txt', '.hidden.png',
+                     'raw/c.png', 'raw/skip.png', 'raw/deep/d.bmp', 'thumbs/e.png'):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'')
+
+
+def names(paths, root):
+    return sorted(os.path.relpath(p, root) for p in paths)
+
+
+def test_top_level_only_without_recursive(tmp_path):
+    make_tree(tmp_path)
+    assert names(Main.iter_image_files([tmp_path]), tmp_path) == ['a.png', 'b.JPG']
+
+
+def test_recursive_with_include_and_exclude(tmp_path):
+    make_tree(tmp_path)
+    found = Main.iter_image_files([tmp_path], recursive=True, include=['*.png', '*.bmp'],
+                                  exclude=['thumbs', 'raw/skip.png'])
+    assert names(found, tmp_path) == ['a.png', 'raw/c.png', 'raw/deep/d.bmp']
+
+
+def test_named_files_are_always_yielded(tmp_path):
+    make_tree(tmp_path)
+    named = tmp_path / 'notes.txt'
+    assert list(Main.iter_image_files([named], exclude=['*.txt'])) == [named]
+
+
+def test_directories_are_read_lazily(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    (first / 'a.png').write_bytes(b'')
+    files = Main.iter_image_files([first, second])
+    assert next(files) == first / 'a.png'
+    # second has not been listed yet, so an image added now is still found
+    (second / 'b.png').write_bytes(b'')
+    assert list(files) == [second / 'b.png']
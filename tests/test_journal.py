@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+
+def test_load_reports_each_job_state_in_queue_order(tmp_path):
+    path = tmp_path / 'batch.journal'
+    journal = Main.Journal(path)
+    journal.write('batch', output_dir=str(tmp_path), params={'mode': 'spline'}, options={})
+    for name in ('a', 'b', 'c'):
+        journal.write('queued', input=f'/in/{name}.png', output=f'/out/{name}.svg')
+    journal.write('started', output='/out/a.svg')
+    journal.write('done', output='/out/a.svg')
+    journal.write('failed', output='/out/b.svg', error='boom')
+    journal.close()
+    with open(path, 'a') as f:
+        f.write('{"event": "done", "outp')  # torn write from a crash
+
+    batch, jobs = Main.Journal.load(path)
+    assert batch['params'] == {'mode': 'spline'}
+    assert list(jobs) == ['/out/a.svg', '/out/b.svg', '/out/c.svg']
+    assert [job['state'] for job in jobs.values()] == ['done', 'failed', 'queued']
+
+
+def test_resume_finishes_queued_jobs_and_reaches_unlisted_images(tmp_path, monkeypatch):
+    images = tmp_path / 'images'
+    images.mkdir()
+    for name in ('a', 'b', 'c', 'd'):
+        (images / f'{name}.png').write_bytes(b'png')
+    out = tmp_path / 'out'
+    out.mkdir()
+    traced = []
+
+    def fake_vectorize(input_path, output_path, **params):
+        traced.append(os.path.basename(input_path))
+        output_path.write_text('<svg/>')
+    monkeypatch.setattr(Main, 'vectorize_image', fake_vectorize)
+
+    # A directory batch that stopped after queueing one image and finishing none
+    path = tmp_path / 'batch.journal'
+    journal = Main.Journal(path)
+    sources = dict(paths=[str(images)], recursive=False, include=None, exclude=None)
+    journal.write('batch', output_dir=str(out), params={}, options={}, sources=sources)
+    journal.write('queued', input=str(images / 'a.png'), output=str(out / '1.svg'))
+    journal.close()
+
+    batch, jobs = Main.Journal.load(path)
+    tasks = [(job['input'], output) for output, job in jobs.items() if job['state'] == 'queued']
+    known = {job['input'] for job in jobs.values()}
+    files = (f for f in Main.iter_image_files(**batch['sources']) if str(f) not in known)
+    journal = Main.Journal(path)
+    assert Main.run_batch(files, out, jobs=1, journal=journal, tasks=tasks, schedule='input') == (4, 0)
+    journal.close()
+
+    assert sorted(traced) == ['a.png', 'b.png', 'c.png', 'd.png']
+    _, jobs = Main.Journal.load(path)
+    assert len(jobs) == 4 and all(job['state'] == 'done' for job in jobs.values())
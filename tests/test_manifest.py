@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+PARAMS = Main.output_settings({})
+
+
+def plan_and_record(manifest, files, output_dir, params=PARAMS):
+    tasks = list(manifest.plan(files, output_dir, params))
+    for input_path, output_path in tasks:
+        output_path.write_text('<svg/>')
+        manifest.record(input_path, output_path)
+    manifest.save()
+    return tasks
+
+
+def test_unchanged_inputs_are_skipped(tmp_path):
+    image = tmp_path / 'a.png'
+    image.write_bytes(b'one')
+    out = tmp_path / 'out'
+    out.mkdir()
+    manifest_path = tmp_path / 'manifest.json'
+    assert len(plan_and_record(Main.Manifest(manifest_path), [image], out)) == 1
+
+    manifest = Main.Manifest(manifest_path)
+    assert list(manifest.plan([image], out, PARAMS)) == []
+    assert manifest.skipped == 1
+
+
+def test_changes_retrace_into_the_same_output(tmp_path):
+    image = tmp_path / 'a.png'
+    image.write_bytes(b'one')
+    out = tmp_path / 'out'
+    out.mkdir()
+    manifest_path = tmp_path / 'manifest.json'
+    [(_, first_output)] = plan_and_record(Main.Manifest(manifest_path), [image], out)
+
+    # Touched but identical content: re-hashed, still skipped
+    os.utime(image, ns=(0, 0))
+    manifest = Main.Manifest(manifest_path)
+    assert list(manifest.plan([image], out, PARAMS)) == []
+
+    image.write_bytes(b'two')
+    assert list(Main.Manifest(manifest_path).plan([image], out, PARAMS)) == [(image, first_output)]
+
+    changed = Main.output_settings({'palette': 8})
+    assert list(Main.Manifest(manifest_path).plan([image], out, changed)) == [(image, first_output)]
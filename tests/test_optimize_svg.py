@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+
+def absolute_points(segments):
+    """Segments as (command, coordinates) with H/V expanded to L, for comparison"""
+    points = []
+    x = y = start_x = start_y = 0.0
+    for cmd, args in segments:
+        if cmd == 'Z':
+            points.append(('Z', ()))
+            x, y = start_x, start_y
+            continue
+        if cmd == 'H':
+            cmd, args = 'L', [args[0], y]
+        elif cmd == 'V':
+            cmd, args = 'L', [x, args[0]]
+        points.append((cmd, tuple(args)))
+        x, y = args[-2], args[-1]
+        if cmd == 'M':
+            start_x, start_y = x, y
+    return points
+
+
+def random_path(rng, count=40):
+    d = []
+    for i in range(count):
+        cmd = 'M' if i == 0 else rng.choice('MLHVCSQTZmlhvcsqtz')
+        arity = Main._PATH_ARGS.get(cmd.upper(), 0)
+        numbers = [f"{rng.uniform(-500, 500):.{rng.randint(0, 6)}f}" for _ in range(arity)]
+        d.append(cmd + ' '.join(numbers))
+    return ' '.join(d)
+
+
+def test_path_round_trip():
+    rng = random.Random(1234)
+    for _ in range(300):
+        precision = rng.randint(0, 4)
+        dx, dy = rng.choice([(0.0, 0.0), (rng.uniform(-50, 50), rng.uniform(-50, 50))])
+        segments = Main._parse_path(random_path(rng))
+        reparsed = Main._parse_path(Main._format_path(segments, precision, dx, dy))
+        expected = absolute_points(segments)
+        actual = absolute_points(reparsed)
+        assert [cmd for cmd, _ in actual] == [cmd for cmd, _ in expected]
+        # Every number is rounded once, so the error never exceeds half a unit
+        tolerance = 0.5 * 10 ** -precision + 1e-9
+        for (cmd, want), (_, got) in zip(expected, actual):
+            shifted = [v + (dx if j % 2 == 0 else dy) for j, v in enumerate(want)]
+            for a, b in zip(shifted, got):
+                assert abs(a - b) <= tolerance
+
+
+def test_colors_only_hex_is_rewritten():
+    attrs = Main._optimize_attributes('path', {'fill': '#AABBCC', 'stroke': 'url(#Grad)'}, 2)
+    assert attrs == {'fill': '#abc', 'stroke': 'url(#Grad)'}
+
+
+def test_inherited_defaults_kept_under_override(tmp_path):
+    svg = tmp_path / 'in.svg'
+    svg.write_text('<svg xmlns="http://www.w3.org/2000/svg">'
+                   '<g fill-rule="evenodd"><path d="M0 0L1 1z" fill-rule="nonzero"/></g>'
+                   '<path d="M0 0L1 1z" fill-rule="nonzero"/></svg>')
+    Main.optimize_svg(svg)
+    text = svg.read_text()
+    assert text.count('fill-rule="nonzero"') == 1
+    assert text.index('fill-rule="nonzero"') < text.index('</g>')
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+
+def test_reserve_numbers_after_existing_outputs(tmp_path):
+    (tmp_path / '3.svg').write_text('<svg/>')
+    (tmp_path / '7.svgz').write_bytes(b'x')
+    (tmp_path / 'notes.svg').write_text('')
+    allocator = Main.OutputAllocator(tmp_path)
+    first, second = allocator.reserve(), allocator.reserve()
+    assert (first.name, second.name) == ('8.svg', '9.svg')
+    assert first.exists() and first.stat().st_size == 0
+
+
+def test_reserve_skips_names_taken_since_the_scan(tmp_path):
+    allocator = Main.OutputAllocator(tmp_path)
+    assert allocator.reserve().name == '1.svg'
+    (tmp_path / '2.svg').write_text('<svg/>')  # another process got there first
+    assert allocator.reserve().name == '3.svg'
+
+
+def test_release_output_only_removes_empty_placeholders(tmp_path):
+    placeholder = Main.OutputAllocator(tmp_path).reserve()
+    earlier = tmp_path / 'earlier.svg'
+    earlier.write_text('<svg/>')
+    for path in (placeholder, earlier, tmp_path / 'missing.svg'):
+        Main.release_output(path)
+    assert not placeholder.exists()
+    assert earlier.read_text() == '<svg/>'
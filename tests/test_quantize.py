@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+
+def test_quantize_maps_every_pixel_to_its_nearest_palette_color(tmp_path):
+    rgba = np.random.default_rng(7).integers(0, 256, (60, 80, 4), dtype=np.uint8)
+    Image.fromarray(rgba, 'RGBA').save(tmp_path / 'in.png')
+    Main.quantize_colors(tmp_path / 'in.png', tmp_path / 'out.png', 16)
+    out = np.asarray(Image.open(tmp_path / 'out.png'))
+
+    palette = np.unique(out[..., :3].reshape(-1, 3), axis=0).astype(np.int64)
+    assert len(palette) <= 16
+    pixels = rgba[..., :3].reshape(-1, 3).astype(np.int64)
+    distances = ((pixels[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+    chosen = ((pixels - out[..., :3].reshape(-1, 3)) ** 2).sum(axis=1)
+    assert np.array_equal(chosen, distances.min(axis=1))
+    assert np.array_equal(out[..., 3], rgba[..., 3])
@@ -0,0 +1,34 @@
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Main
+
+
+def png_header(width, height):
+    return b'\x89PNG\r\n\x1a\n' + b'\x00\x00\x00\rIHDR' + struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+
+def test_read_image_size_from_header(tmp_path):
+    image = tmp_path / 'a.png'
+    image.write_bytes(png_header(640, 480))
+    assert Main.read_image_size(image) == (640, 480)
+
+
+def test_truncated_headers_have_no_size(tmp_path):
+    (tmp_path / 'bad.jpg').write_bytes(b'\xff\xd8\xff\xe0')
+    (tmp_path / 'bad.png').write_bytes(b'\x89PNG\r\n\x1a\n\x00\x00')
+    assert Main.read_image_size(tmp_path / 'bad.jpg') is None
+    assert Main.read_image_size(tmp_path / 'bad.png') is None
+
+
+def test_schedule_tasks_largest_first_despite_bad_headers(tmp_path):
+    small, large, bad = tmp_path / 'small.png', tmp_path / 'large.png', tmp_path / 'bad.png'
+    small.write_bytes(png_header(10, 10))
+    large.write_bytes(png_header(100, 100))
+    bad.write_bytes(b'\x89PNG\r\n\x1a\n\x00\x00')
+    tasks = [(small, '1.svg'), (bad, '2.svg'), (large, '3.svg'), (tmp_path / 'missing.png', '4.svg')]
+    order = [output for _, output in Main.schedule_tasks(tasks)]
+    assert order == ['3.svg', '1.svg', '2.svg', '4.svg']